@@ -1,27 +1,94 @@
+import time
+
+_import_started = time.perf_counter()  # Cold-start timings are measured from here
+
 from flask import Flask
-from flask_migrate import Migrate  # Added Flask-Migrate
 from app.config import Config
 from app.models import db
+from app.routes.api_routes import api_bp
 from app.routes.crypto_routes import crypto_bp
 from app.routes.general_routes import general_bp
-from app.scheduler import start_scheduler
+from app.services.cache_service import fragment_cache
+from app.services.cold_store import cold_store
+from app.services.warmup_service import start_warm_up, startup_state, warm_up
 from app.utils.helpers import format_currency, get_logger
+from app.utils.http_client import http_client
+from app.utils.rate_limiter import rate_limiter
+from app.utils.response_cache import response_cache
+import os
+import sys
+
+startup_state.process_started = _import_started
+
+# Options of the flask command itself that take a value, e.g. `flask --app run.py db upgrade`
+FLASK_CLI_VALUE_OPTIONS = ("-A", "--app", "-e", "--env-file")
+
+
+def _running_db_command():
+    """True when this process is a `flask db ...` command (migrations own the schema there)."""
+    args = iter(sys.argv[1:])
+    for arg in args:
+        if arg in FLASK_CLI_VALUE_OPTIONS:
+            next(args, None)
+        elif not arg.startswith("-"):
+            return arg == "db"
+    return False
+
+
+def create_app(background_warmup=None):
+    """
+    Builds the app without touching the network or, by default, the database.
 
-def create_app():
+    Table creation, the time-series store load and template compilation run in a background
+    warmup (see `warmup_service`) so the process serves /healthz immediately and reports
+    /readyz once warm. Pass `background_warmup=False` (or set BACKGROUND_WARMUP=0) to run
+    them before returning instead, as the ingestion worker does.
+    """
     app = Flask(__name__)
     app.config.from_object(Config)
 
     db.init_app(app)
-    Migrate(app, db)  # Ensuring Flask-Migrate is initialized
+
+    # Only the `flask db` commands need Flask-Migrate, so it is registered when the app is
+    # loaded by the flask CLI; gunicorn and run.py skip importing alembic (~0.4s). The flask
+    # CLI sets FLASK_RUN_FROM_CLI for `flask run` too, so only `flask db` skips the warmup
+    migrating = False
+    if os.environ.get("FLASK_RUN_FROM_CLI"):
+        from flask_migrate import Migrate
+        Migrate(app, db)
+        migrating = _running_db_command()
+
+    # Size the shared CoinGecko rate limit buckets from config
+    rate_limiter.configure(app.config["COINGECKO_RATE_LIMITS"])
+
+    # Size the shared keep-alive HTTP client (pool must cover the backfill workers)
+    http_client.configure(
+        pool_size=max(app.config["HTTP_POOL_SIZE"], app.config["HISTORY_FETCH_WORKERS"]),
+        connect_timeout=app.config["HTTP_CONNECT_TIMEOUT"],
+        read_timeout=app.config["HTTP_READ_TIMEOUT"],
+        backoff_base=app.config["HTTP_BACKOFF_BASE"],
+        backoff_max=app.config["HTTP_BACKOFF_MAX"],
+    )
+
+    # Persistent response cache, shared between worker processes through one SQLite file
+    response_cache.configure(
+        app.config["HTTP_CACHE_PATH"] or os.path.join(app.instance_path, "http_cache.sqlite3"),
+        app.config["HTTP_CACHE_TTLS"],
+    )
+
+    # Per-fragment TTLs for the rendered page cache
+    fragment_cache.configure(app.config["FRAGMENT_CACHE_TTLS"])
 
     # Initialize Logging
     logger = get_logger()
     logger.info("Flask app is starting...")
 
-    # Ensure Database Tables Exist
-    with app.app_context():
-        db.create_all()
-        logger.info("Database tables created (if they didn't already exist).")
+    # The time-series snapshot lives in the instance folder unless configured otherwise
+    if not app.config["TIMESERIES_SNAPSHOT_PATH"]:
+        app.config["TIMESERIES_SNAPSHOT_PATH"] = os.path.join(app.instance_path, "timeseries")
+
+    # Archived history segments, likewise
+    cold_store.configure(app.config["COLD_STORAGE_PATH"] or os.path.join(app.instance_path, "cold"))
 
     # Register Jinja filter for currency formatting
     app.jinja_env.filters['format_currency'] = format_currency  
@@ -29,8 +96,25 @@ def create_app():
     # Register Blueprints
     app.register_blueprint(crypto_bp)
     app.register_blueprint(general_bp)
+    app.register_blueprint(api_bp)
+
+    # Create missing tables, warm the in-memory time-series store and compile templates
+    # (not while migrating: the tables belong to the migration, which may still be running)
+    if background_warmup is None:
+        background_warmup = app.config["BACKGROUND_WARMUP"]
+    if migrating:
+        background_warmup = False
+    elif background_warmup:
+        start_warm_up(app)
+    else:
+        warm_up(app)
 
-    # Start the scheduler
-    start_scheduler(app)
+    # Web processes serve only; ingestion runs in worker.py unless this process opts in
+    if app.config["RUN_SCHEDULER"]:
+        from app.scheduler import start_scheduler
+        start_scheduler(app)
 
+    startup_state.mark_booted()
+    logger.info(f"App created {startup_state.boot_seconds:.3f}s after process start"
+                f"{'; warming up in the background' if background_warmup else ''}.")
     return app
@@ -8,3 +8,107 @@ class Config:
     # Determine which database URL to use
     DATABASE_URL = os.getenv("DATABASE_URL")
     SQLALCHEMY_DATABASE_URI = DATABASE_URL if DATABASE_URL else "sqlite:///default.db"
+
+    # How many coins (by market cap) the ingest tracks, fetched in pages of MARKET_PAGE_SIZE (max 250)
+    MARKET_UNIVERSE_SIZE = int(os.getenv("MARKET_UNIVERSE_SIZE", 10))
+    MARKET_PAGE_SIZE = int(os.getenv("MARKET_PAGE_SIZE", 250))
+
+    # Number of concurrent market_chart fetches during a historical backfill
+    HISTORY_FETCH_WORKERS = int(os.getenv("HISTORY_FETCH_WORKERS", 4))
+
+    # "incremental" fetches only the days after each coin's newest stored row; "full" always
+    # fetches the last HISTORY_DAYS days. Coins without history always get the full window.
+    HISTORY_SYNC_MODE = os.getenv("HISTORY_SYNC_MODE", "incremental")
+    HISTORY_DAYS = int(os.getenv("HISTORY_DAYS", 30))
+
+    # Which hourly point represents a stored day: "open", "close" or "mean"
+    HISTORY_DAILY_RULE = os.getenv("HISTORY_DAILY_RULE", "close")
+
+    # CoinGecko call budgets as (calls per minute, burst) per endpoint class; "global" caps them all
+    COINGECKO_RATE_LIMITS = {
+        "global": (int(os.getenv("COINGECKO_CALLS_PER_MINUTE", 30)), 5),
+        "markets": (10, 3),
+        "market_chart": (25, 5),
+    }
+
+    # Shared HTTP client: pooled connections per host, timeouts (seconds) and retry backoff
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 10))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 3.05))
+    HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 20))
+    HTTP_BACKOFF_BASE = 1.0
+    HTTP_BACKOFF_MAX = 30.0
+
+    # Disk cache for CoinGecko responses, shared by all workers (defaults to the instance folder)
+    HTTP_CACHE_PATH = os.getenv("HTTP_CACHE_PATH")
+    HTTP_CACHE_TTLS = {
+        "global": 60,
+        "markets": int(os.getenv("HTTP_CACHE_TTL_MARKETS", 60)),
+        "market_chart": int(os.getenv("HTTP_CACHE_TTL_MARKET_CHART", 900)),
+    }
+
+    # Seconds a process reuses the data version it read before checking the database again
+    DATA_VERSION_TTL = float(os.getenv("DATA_VERSION_TTL", 2))
+
+    # /api/history bounds: coins per request, and the window used when `from` is omitted
+    API_HISTORY_MAX_IDS = int(os.getenv("API_HISTORY_MAX_IDS", 50))
+    API_HISTORY_DEFAULT_DAYS = int(os.getenv("API_HISTORY_DEFAULT_DAYS", 365))
+
+    # Directory for the memory-mapped time-series snapshot (defaults to the instance folder)
+    TIMESERIES_SNAPSHOT_PATH = os.getenv("TIMESERIES_SNAPSHOT_PATH")
+
+    # Longest return window (days) /api/correlation will compute over
+    API_CORRELATION_MAX_WINDOW = int(os.getenv("API_CORRELATION_MAX_WINDOW", 3650))
+
+    # Rows per overview page, and the largest `per_page` a request may ask for
+    INDEX_PAGE_SIZE = int(os.getenv("INDEX_PAGE_SIZE", 50))
+    INDEX_MAX_PAGE_SIZE = int(os.getenv("INDEX_MAX_PAGE_SIZE", 250))
+
+    # Seconds a rendered page fragment may be served before re-rendering, even without a new ingest
+    FRAGMENT_CACHE_TTLS = {
+        "index_table": int(os.getenv("FRAGMENT_TTL_INDEX_TABLE", 300)),
+        "currency_overview": int(os.getenv("FRAGMENT_TTL_CURRENCY_OVERVIEW", 300)),
+        "currency_history": int(os.getenv("FRAGMENT_TTL_CURRENCY_HISTORY", 1800)),
+    }
+
+    # Ingestion runs in `python worker.py`; set RUN_SCHEDULER=1 to run it inside the web process instead
+    RUN_SCHEDULER = os.getenv("RUN_SCHEDULER", "false").lower() in ("1", "true", "yes")
+    UPDATE_INTERVAL_MINUTES = int(os.getenv("UPDATE_INTERVAL_MINUTES", 30))
+
+    # Leader election between ingestion processes: PostgreSQL advisory lock key, or lock file
+    # (defaults to the instance folder) on other databases; standbys retry every LEADER_RETRY_SECONDS
+    LEADER_LOCK_KEY = int(os.getenv("LEADER_LOCK_KEY", 7210431019))
+    LEADER_LOCK_PATH = os.getenv("LEADER_LOCK_PATH")
+    LEADER_RETRY_SECONDS = int(os.getenv("LEADER_RETRY_SECONDS", 30))
+
+    # Create missing tables during warmup (always off under the flask CLI, where migrations own the schema)
+    AUTO_CREATE_TABLES = os.getenv("AUTO_CREATE_TABLES", "true").lower() in ("1", "true", "yes")
+
+    # Run startup warmup (table creation, time-series load) in the background so the app serves right away
+    BACKGROUND_WARMUP = os.getenv("BACKGROUND_WARMUP", "true").lower() in ("1", "true", "yes")
+
+    # Live price stream: how often each web process checks for a new ingest, and the idle keep-alive interval
+    STREAM_POLL_SECONDS = float(os.getenv("STREAM_POLL_SECONDS", 5))
+    STREAM_HEARTBEAT_SECONDS = float(os.getenv("STREAM_HEARTBEAT_SECONDS", 15))
+
+    # Days of price_changes history kept for consumers tailing the changelog, and the most /api/changes returns at once
+    CHANGELOG_RETENTION_DAYS = int(os.getenv("CHANGELOG_RETENTION_DAYS", 7))
+    API_CHANGES_MAX_LIMIT = int(os.getenv("API_CHANGES_MAX_LIMIT", 1000))
+
+    # Intraday ticks are kept TICK_RETENTION_HOURS and hourly rollups HOURLY_ROLLUP_RETENTION_DAYS; daily rollups are kept
+    TICK_RETENTION_HOURS = int(os.getenv("TICK_RETENTION_HOURS", 48))
+    HOURLY_ROLLUP_RETENTION_DAYS = int(os.getenv("HOURLY_ROLLUP_RETENTION_DAYS", 90))
+
+    # /api/intraday picks the coarsest resolution giving at least this many points; window used when `from` is omitted
+    INTRADAY_MIN_POINTS = int(os.getenv("INTRADAY_MIN_POINTS", 48))
+    API_INTRADAY_DEFAULT_HOURS = int(os.getenv("API_INTRADAY_DEFAULT_HOURS", 24))
+
+    # /api/ohlc: candles returned when `from` is omitted, and the most one request may cover
+    API_OHLC_DEFAULT_CANDLES = int(os.getenv("API_OHLC_DEFAULT_CANDLES", 168))
+    API_OHLC_MAX_CANDLES = int(os.getenv("API_OHLC_MAX_CANDLES", 2000))
+
+    # History older than ARCHIVE_AFTER_DAYS (0 disables archiving; never less than HISTORY_DAYS) moves out of
+    # historical_data into compressed per-coin segments of ARCHIVE_SEGMENT_DAYS days under COLD_STORAGE_PATH
+    # (defaults to the instance folder). Keep the segment size once data is archived.
+    ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", 365))
+    ARCHIVE_SEGMENT_DAYS = int(os.getenv("ARCHIVE_SEGMENT_DAYS", 90))
+    COLD_STORAGE_PATH = os.getenv("COLD_STORAGE_PATH")
@@ -7,7 +7,7 @@ class Cryptocurrency(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     coingecko_id = db.Column(db.String(50), unique=True, nullable=False)
     name = db.Column(db.String(255), nullable=False)
-    current_price = db.Column(db.Numeric(18, 2), nullable=False)
+    current_price = db.Column(db.Numeric(18, 8), nullable=False)  # 8 places, as many coins trade below a cent
     market_cap = db.Column(db.Numeric(18, 2), nullable=False)
     volume = db.Column(db.Numeric(18, 2), nullable=False)
     circulating_supply = db.Column(db.Numeric(18, 0), nullable=False)
@@ -15,6 +15,14 @@ class Cryptocurrency(db.Model):
     max_supply = db.Column(db.Numeric(18, 0))
     last_updated = db.Column(db.DateTime, default=db.func.current_timestamp())
 
+    # Keyset pagination on the overview seeks into these; the trailing id makes each key unique
+    __table_args__ = (
+        db.Index('ix_cryptocurrencies_market_cap_id', 'market_cap', 'id'),
+        db.Index('ix_cryptocurrencies_current_price_id', 'current_price', 'id'),
+        db.Index('ix_cryptocurrencies_volume_id', 'volume', 'id'),
+        db.Index('ix_cryptocurrencies_name_id', 'name', 'id'),
+    )
+
 class HistoricalData(db.Model):
     __tablename__ = 'historical_data'
     
@@ -30,3 +38,90 @@ class HistoricalData(db.Model):
         db.UniqueConstraint('cryptocurrency_id', 'date', name='historical_data_cryptocurrency_id_date_key'),
     )
 
+class DataVersion(db.Model):
+    __tablename__ = 'data_versions'
+
+    # One row per dataset; bumped by the ingestion job whenever it commits new data
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+
+class TechnicalIndicator(db.Model):
+    __tablename__ = 'technical_indicators'
+
+    # Derived from historical_data by app.services.indicator_service; NULL until a window fills
+    id = db.Column(db.Integer, primary_key=True)
+    cryptocurrency_id = db.Column(db.Integer, db.ForeignKey('cryptocurrencies.id'), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    daily_return = db.Column(db.Float)
+    sma_7 = db.Column(db.Float)
+    sma_30 = db.Column(db.Float)
+    volatility_30 = db.Column(db.Float)
+    rsi_14 = db.Column(db.Float)
+
+    __table_args__ = (
+        db.UniqueConstraint('cryptocurrency_id', 'date', name='technical_indicators_cryptocurrency_id_date_key'),
+    )
+
+class PriceChange(db.Model):
+    __tablename__ = 'price_changes'
+
+    # Append-only log of snapshot changes; consumers tail it by `seq`. `fields` holds only the
+    # columns that changed (all of them for a newly listed coin).
+    seq = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    cryptocurrency_id = db.Column(db.Integer, db.ForeignKey('cryptocurrencies.id'), nullable=False)
+    changed_at = db.Column(db.DateTime, nullable=False, index=True)
+    fields = db.Column(db.JSON, nullable=False)
+
+    # Never reuse a seq, even after pruning empties the table; tailing readers would skip entries
+    __table_args__ = {'sqlite_autoincrement': True}
+
+class PriceTick(db.Model):
+    __tablename__ = 'price_ticks'
+
+    # Raw intraday observations (ingest snapshots and market_chart points); pruned after
+    # TICK_RETENTION_HOURS, by which time price_rollups holds their hourly and daily closes
+    cryptocurrency_id = db.Column(db.Integer, db.ForeignKey('cryptocurrencies.id'), primary_key=True)
+    ts = db.Column(db.DateTime, primary_key=True, index=True)
+    price = db.Column(db.Numeric(18, 8), nullable=False)
+    market_cap = db.Column(db.Numeric(18, 2), nullable=False)
+    volume = db.Column(db.Numeric(18, 2), nullable=False)
+
+class PriceRollup(db.Model):
+    __tablename__ = 'price_rollups'
+
+    # Closing values per `resolution` ("1h" or "1d") bucket; `close_at` is the time of the
+    # tick they came from, so merging points in any order keeps the latest one
+    cryptocurrency_id = db.Column(db.Integer, db.ForeignKey('cryptocurrencies.id'), primary_key=True)
+    resolution = db.Column(db.String(4), primary_key=True)
+    bucket = db.Column(db.DateTime, primary_key=True)
+    price = db.Column(db.Numeric(18, 8), nullable=False)
+    market_cap = db.Column(db.Numeric(18, 2), nullable=False)
+    volume = db.Column(db.Numeric(18, 2), nullable=False)
+    close_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_price_rollups_resolution_bucket', 'resolution', 'bucket'),
+    )
+
+class PriceCandle(db.Model):
+    __tablename__ = 'price_candles'
+
+    # OHLCV per `interval` ("1h", "4h" or "1d") starting at `bucket`, merged from intraday points
+    # as they are ingested. `open_at` / `close_at` are the times of the opening and closing
+    # points, so later merges only replace them with earlier / later ones. `volume` is
+    # CoinGecko's rolling 24h volume at the close.
+    cryptocurrency_id = db.Column(db.Integer, db.ForeignKey('cryptocurrencies.id'), primary_key=True)
+    interval = db.Column(db.String(4), primary_key=True)
+    bucket = db.Column(db.DateTime, primary_key=True)
+    open = db.Column(db.Numeric(18, 8), nullable=False)
+    high = db.Column(db.Numeric(18, 8), nullable=False)
+    low = db.Column(db.Numeric(18, 8), nullable=False)
+    close = db.Column(db.Numeric(18, 8), nullable=False)
+    volume = db.Column(db.Numeric(18, 2), nullable=False)
+    open_at = db.Column(db.DateTime, nullable=False)
+    close_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_price_candles_interval_bucket', 'interval', 'bucket'),
+    )
@@ -0,0 +1,238 @@
+import datetime
+import re
+
+from flask import Blueprint, current_app, jsonify, request
+from app.services.cache_service import get_data_version, api_payload_cache, fragment_cache, trends_payload_cache
+from app.services.analytics_service import pairwise_covariance, return_matrix, tracked_coin_ids
+from app.services.candle_service import CANDLE_INTERVALS, load_candles
+from app.services.changelog_service import read_changes
+from app.services.history_service import load_aligned_history
+from app.services.stream_service import price_broadcaster, price_watcher
+from app.services.tick_service import RESOLUTIONS, load_intraday, pick_resolution
+from app.utils.helpers import check_date_range, current_minute, parse_date_arg, parse_datetime_arg
+from app.utils.serialization import cached_json_response, dumps_json
+
+api_bp = Blueprint('api', __name__, url_prefix='/api')
+
+# Interval units in days, and the epoch day their buckets start from (1970-01-05 was a Monday)
+INTERVAL_UNITS = {'d': (1, 0), 'w': (7, 4)}
+
+
+def _parse_interval(value):
+    """Parses intervals like '1d', '3d' or '1w' into (bucket size in days, anchor epoch day)."""
+    match = re.fullmatch(r'(\d+)([dw])', value or '')
+    if not match or int(match.group(1)) < 1:
+        raise ValueError("'interval' must look like 1d, 7d or 1w")
+    unit_days, anchor = INTERVAL_UNITS[match.group(2)]
+    return int(match.group(1)) * unit_days, anchor
+
+
+# Batched history for several coins - one query, aligned columnar arrays
+@api_bp.route('/history')
+def history():
+    """Return aligned history for `ids=a,b,c` between `from` and `to` at `interval` (default 1d).
+
+    Without `from`, the window is the last `API_HISTORY_DEFAULT_DAYS` days before `to`
+    (default: today). At most `API_HISTORY_MAX_IDS` coins may be requested at once.
+    """
+    ids = sorted({i.strip() for i in request.args.get('ids', '').split(',') if i.strip()})
+    max_ids = current_app.config.get('API_HISTORY_MAX_IDS', 50)
+    if not ids:
+        return jsonify({'error': "'ids' is required, e.g. ids=bitcoin,ethereum"}), 400
+    if len(ids) > max_ids:
+        return jsonify({'error': f"At most {max_ids} ids can be requested at once"}), 400
+
+    try:
+        end = parse_date_arg('to') or datetime.datetime.now(datetime.timezone.utc).date()
+        start = parse_date_arg('from') or end - datetime.timedelta(
+            days=current_app.config.get('API_HISTORY_DEFAULT_DAYS', 365))
+        interval = request.args.get('interval', '1d')
+        interval_days, anchor_day = _parse_interval(interval)
+        check_date_range(start, end)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    def build():
+        epoch_days, series = load_aligned_history(ids, start, end, interval_days, anchor_day)
+        return {
+            'interval': interval,
+            'epoch_days': epoch_days,
+            'series': series,
+            'missing': [coingecko_id for coingecko_id in ids if coingecko_id not in series],
+        }
+
+    cache_key = f"history:{','.join(ids)}:{start}:{end}:{interval}"
+    return cached_json_response(api_payload_cache, cache_key, get_data_version(), build)
+
+
+# Intraday series for one coin, at the coarsest resolution that covers the window in enough detail
+@api_bp.route('/intraday')
+def intraday():
+    """Return `id`'s prices between `from` and `to` (ISO 8601, UTC) as columnar arrays.
+
+    Without `from`, the window is the last `API_INTRADAY_DEFAULT_HOURS` hours before `to`
+    (default: now). `resolution` is `auto` (default), `raw`, `1h` or `1d`; `auto` picks the
+    coarsest one that still gives `INTRADAY_MIN_POINTS` points and is retained that far back.
+    """
+    coingecko_id = request.args.get('id', '').strip()
+    if not coingecko_id:
+        return jsonify({'error': "'id' is required, e.g. id=bitcoin"}), 400
+
+    try:
+        end = parse_datetime_arg('to') or current_minute() + datetime.timedelta(minutes=1)
+        start = parse_datetime_arg('from') or end - datetime.timedelta(
+            hours=current_app.config.get('API_INTRADAY_DEFAULT_HOURS', 24))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if start >= end:
+        return jsonify({'error': "'from' must be before 'to'"}), 400
+
+    resolution = request.args.get('resolution', 'auto')
+    if resolution == 'auto':
+        resolution = pick_resolution(start, end)
+    elif resolution not in RESOLUTIONS:
+        return jsonify({'error': f"'resolution' must be auto or one of {', '.join(RESOLUTIONS)}"}), 400
+
+    def build():
+        series = load_intraday(coingecko_id, start, end, resolution)
+        return {
+            'id': coingecko_id,
+            'resolution': resolution,
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            **(series or {'timestamps': [], 'prices': [], 'market_caps': [], 'volumes': []}),
+        }
+
+    cache_key = f"intraday:{coingecko_id}:{start.isoformat()}:{end.isoformat()}:{resolution}"
+    return cached_json_response(api_payload_cache, cache_key, get_data_version(), build)
+
+
+# Stored OHLCV candles for one coin
+@api_bp.route('/ohlc')
+def ohlc():
+    """Return `id`'s candles at `interval` (1h, 4h or 1d; default 1h) starting between `from` and `to`.
+
+    Without `from`, the last `API_OHLC_DEFAULT_CANDLES` candles before `to` (default: now)
+    are returned. Candles are read as stored; the last one may still be open.
+    """
+    coingecko_id = request.args.get('id', '').strip()
+    if not coingecko_id:
+        return jsonify({'error': "'id' is required, e.g. id=bitcoin"}), 400
+    interval = request.args.get('interval', '1h')
+    if interval not in CANDLE_INTERVALS:
+        return jsonify({'error': f"'interval' must be one of {', '.join(CANDLE_INTERVALS)}"}), 400
+    step = datetime.timedelta(seconds=CANDLE_INTERVALS[interval])
+
+    try:
+        end = parse_datetime_arg('to') or current_minute()
+        start = parse_datetime_arg('from') or end - step * current_app.config.get('API_OHLC_DEFAULT_CANDLES', 168)
+        check_date_range(start, end)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    max_candles = current_app.config.get('API_OHLC_MAX_CANDLES', 2000)
+    if (end - start) / step > max_candles:
+        return jsonify({'error': f"At most {max_candles} {interval} candles can be requested at once"}), 400
+
+    def build():
+        candles = load_candles(coingecko_id, interval, start, end)
+        return {
+            'id': coingecko_id,
+            'interval': interval,
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            **(candles or {name: [] for name in ('timestamps', 'opens', 'highs', 'lows', 'closes', 'volumes')}),
+        }
+
+    cache_key = f"ohlc:{coingecko_id}:{interval}:{start.isoformat()}:{end.isoformat()}"
+    return cached_json_response(api_payload_cache, cache_key, get_data_version(), build)
+
+
+def _matrix_to_json(matrix):
+    """Nested lists with NaN replaced by None, so the payload stays valid JSON."""
+    return [[None if value != value else value for value in row] for row in matrix.tolist()]
+
+
+# Cross-asset correlation and covariance of daily returns for every tracked coin
+@api_bp.route('/correlation')
+def correlation():
+    """Return correlation and covariance matrices of daily returns over the last `window` days.
+
+    Days a coin has no data for are skipped pairwise, and pairs sharing fewer than
+    `min_periods` days are null. Results are cached per window until the next ingest.
+    """
+    window = request.args.get('window', 90, type=int)
+    min_periods = request.args.get('min_periods', 10, type=int)
+    max_window = current_app.config.get('API_CORRELATION_MAX_WINDOW', 3650)
+    if not 2 <= window <= max_window:
+        return jsonify({'error': f"'window' must be between 2 and {max_window} days"}), 400
+
+    def build():
+        start, coins, returns = return_matrix(tracked_coin_ids(), window)
+        covariance, correlation_matrix, observations = pairwise_covariance(returns, min_periods=min_periods)
+        return {
+            'window': window,
+            'start_epoch_day': start,
+            'end_epoch_day': None if start is None else start + window - 1,
+            'coins': coins,
+            'correlation': _matrix_to_json(correlation_matrix),
+            'covariance': _matrix_to_json(covariance),
+            'observations': observations.tolist(),
+        }
+
+    cache_key = f"correlation:{window}:{min_periods}"
+    return cached_json_response(api_payload_cache, cache_key, get_data_version(), build)
+
+
+# Snapshot changelog, tailed by sequence number
+@api_bp.route('/changes')
+def changes():
+    """Return `price_changes` entries after `after` (default 0), oldest first, at most `limit` of them.
+
+    Each entry lists only the fields that changed. Pass the returned `last_seq` as the next
+    `after` to keep tailing; `has_more` means another page is already waiting.
+    """
+    after = request.args.get('after', 0, type=int)
+    max_limit = current_app.config.get('API_CHANGES_MAX_LIMIT', 1000)
+    limit = min(max(request.args.get('limit', max_limit, type=int), 1), max_limit)
+
+    entries = read_changes(after, limit=limit)
+    return current_app.response_class(dumps_json({
+        'entries': [
+            {'seq': seq, 'coin': coingecko_id, 'changed_at': changed_at.isoformat(), 'fields': fields}
+            for seq, coingecko_id, changed_at, fields in entries
+        ],
+        'last_seq': entries[-1][0] if entries else after,
+        'has_more': len(entries) == limit,
+    }), mimetype='application/json')
+
+
+# Live price deltas as server-sent events
+@api_bp.route('/stream/prices')
+def stream_prices():
+    """Stream `prices` events (`{"seq": n, "coins": {id: {field: value}}}`) as ingestion commits.
+
+    Only changed coins and fields are sent. Event ids are changelog sequence numbers, so
+    reconnecting browsers send `Last-Event-ID` to any worker and get what they missed; a `reset`
+    event means too much was missed (or the id is unknown) and the page should reload.
+    """
+    price_watcher.ensure_started(current_app._get_current_object())
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    stream = price_broadcaster.stream(last_event_id, heartbeat=current_app.config.get('STREAM_HEARTBEAT_SECONDS', 15),
+                                      replay=price_watcher.replay)
+
+    response = current_app.response_class(stream, mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Stop nginx from buffering the stream
+    return response
+
+
+# Hit/miss counters of the in-process caches, for checking how much traffic they absorb
+@api_bp.route('/cache/stats')
+def cache_stats():
+    return jsonify({
+        'data_version': get_data_version(),
+        'fragments': fragment_cache.stats(),
+        'trends_payloads': trends_payload_cache.stats(),
+        'api_payloads': api_payload_cache.stats(),
+        'price_stream': price_broadcaster.stats(),
+    })
@@ -1,43 +1,82 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
-from app.models import db, Cryptocurrency, HistoricalData
-from app.services.coingecko_service import fetch_top_cryptos
-from app.services.crypto_service import update_cryptocurrencies
-from app.utils.helpers import format_currency, format_date  # Import helper functions
+import datetime
+
+from markupsafe import Markup
+from flask import Blueprint, abort, current_app, render_template, request, redirect, url_for, flash, jsonify
+from app.models import db, Cryptocurrency
+from app.services.cache_service import bump_data_version, fragment_cache, get_data_version, trends_payload_cache
+from app.services.coingecko_service import fetch_crypto_by_id
+from app.services.indicator_service import load_indicator_columns
+from app.services.history_service import downsample_history, get_history, history_rows
+from app.services.overview_service import DEFAULT_ORDERS, SORT_COLUMNS, overview_page
+from app.utils.helpers import check_date_range, format_date, parse_date_arg, parse_int_arg  # Import helper functions
+from app.utils.leader_lock import leader_lock
+from app.utils.serialization import cached_json_response
 
 
 crypto_bp = Blueprint('crypto', __name__)
 
-# Home Page - Displays all cryptocurrencies
-# Home Page - Displays all cryptocurrencies
+# Home Page - Displays one page of cryptocurrencies, sorted server-side
 @crypto_bp.route('/')
 def index():
-    cryptocurrencies = Cryptocurrency.query.all()
-    return render_template('index.html', cryptocurrencies=cryptocurrencies, format_currency=format_currency)
+    sort = request.args.get('sort', 'market_cap')
+    if sort not in SORT_COLUMNS:
+        sort = 'market_cap'
+    order = request.args.get('order')
+    if order not in ('asc', 'desc'):
+        order = DEFAULT_ORDERS[sort]
+    per_page = request.args.get('per_page', current_app.config.get('INDEX_PAGE_SIZE', 50), type=int)
+    per_page = min(max(per_page, 1), current_app.config.get('INDEX_MAX_PAGE_SIZE', 250))
+    after, before = request.args.get('after'), request.args.get('before')
+
+    def render_table():
+        page = overview_page(sort, order, after=after, before=before, limit=per_page)
+        return Markup(render_template('_index_table.html', cryptocurrencies=page['rows'], page=page, sort=sort,
+                                      order=order, per_page=per_page, sort_defaults=DEFAULT_ORDERS))
+
+    # The query and rendering only run once per page and data version (or TTL)
+    try:
+        table = fragment_cache.render('index_table', f"{sort}:{order}:{per_page}:{after}:{before}",
+                                      get_data_version(), render_table)
+    except ValueError as e:
+        abort(400, description=str(e))
 
-# Update Prices - Fetch latest prices and update the database
+    return render_template('index.html', table=table)
+
+# Update Prices - Ask the ingestion leader to refresh now; web requests never ingest themselves
 @crypto_bp.route('/update_prices')
 def update_prices():
-    try:
-        crypto_data = fetch_top_cryptos()
-        update_cryptocurrencies(crypto_data)
-        flash('Prices updated successfully!', 'success')
-    except Exception as e:
-        flash(f'Error updating prices: {str(e)}', 'danger')
+    from app.scheduler import scheduler  # Only processes running ingestion need APScheduler loaded
+
+    if scheduler.running and scheduler.get_job('crypto_update') and leader_lock.held():
+        scheduler.modify_job('crypto_update', next_run_time=datetime.datetime.now())
+        flash('Price update started; new prices appear once it finishes.', 'success')
+    else:
+        interval = current_app.config['UPDATE_INTERVAL_MINUTES']
+        flash(f'Prices are refreshed by the ingestion worker every {interval} minutes.', 'info')
     return redirect(url_for('crypto.index'))
 
 # Cryptocurrency Details - Displays historical data for a single crypto
 @crypto_bp.route('/currency/<string:coingecko_id>')
 def currency_detail(coingecko_id):
-    currency = Cryptocurrency.query.filter_by(coingecko_id=coingecko_id).first_or_404()
-    historical_data = HistoricalData.query.filter_by(cryptocurrency_id=currency.id).order_by(HistoricalData.date.asc()).all()
+    version = get_data_version()
 
-    # Format historical dates before sending them to the template
-    formatted_historical_data = [
-        {'date': format_date(data.date.timestamp()), 'price': data.price, 'market_cap': data.market_cap}
-        for data in historical_data
-    ]
+    def render_overview():
+        currency = Cryptocurrency.query.filter_by(coingecko_id=coingecko_id).first_or_404()
+        return currency.name, Markup(render_template('_currency_overview.html', currency=currency))
 
-    return render_template('currency_details.html', currency=currency, historical_data=formatted_historical_data)
+    def render_history():
+        # Format historical dates before sending them to the template
+        formatted_historical_data = [
+            {**row, 'date': format_date(row['date'])}
+            for row in history_rows(get_history(coingecko_id))
+        ]
+        return Markup(render_template('_currency_history.html', historical_data=formatted_historical_data))
+
+    currency_name, overview = fragment_cache.render('currency_overview', coingecko_id, version, render_overview)
+    history = fragment_cache.render('currency_history', coingecko_id, version, render_history)
+
+    return render_template('currency_details.html', currency_name=currency_name,
+                           overview=overview, history=history)
 
 # Add/Edit Cryptocurrency
 @crypto_bp.route('/manage_currency', methods=['GET', 'POST'])
@@ -49,10 +88,8 @@ def manage_currency(id=None):
         try:
             coingecko_id = request.form['coingecko_id']
 
-            # Fetch data from CoinGecko API
-            crypto_data = fetch_top_cryptos()
-            
-            data = next((c for c in crypto_data if c['id'] == coingecko_id), None)
+            # Fetch just this coin from CoinGecko API
+            data = fetch_crypto_by_id(coingecko_id)
             if not data:
                 flash(f"Failed to fetch data for {coingecko_id}", 'danger')
                 return redirect(url_for('crypto.index'))
@@ -62,6 +99,9 @@ def manage_currency(id=None):
             current_price = data['current_price']
             market_cap = data['market_cap']
             volume = data['total_volume']
+            circulating_supply = data.get('circulating_supply') or 0
+            total_supply = data.get('total_supply')
+            max_supply = data.get('max_supply')
 
             if currency:  # Editing existing currency
                 currency.name = name
@@ -69,16 +109,23 @@ def manage_currency(id=None):
                 currency.current_price = current_price
                 currency.market_cap = market_cap
                 currency.volume = volume
+                currency.circulating_supply = circulating_supply
+                currency.total_supply = total_supply
+                currency.max_supply = max_supply
             else:  # Adding new currency
                 currency = Cryptocurrency(
                     name=name,
                     coingecko_id=coingecko_id,
                     current_price=current_price,
                     market_cap=market_cap,
-                    volume=volume
+                    volume=volume,
+                    circulating_supply=circulating_supply,
+                    total_supply=total_supply,
+                    max_supply=max_supply
                 )
                 db.session.add(currency)
 
+            bump_data_version()  # Drop cached pages showing the old figures
             db.session.commit()
             flash(f'Cryptocurrency {"updated" if id else "added"} successfully!', 'success')
             return redirect(url_for('crypto.index'))
@@ -96,42 +143,69 @@ def trends():
     # Query the top 10 cryptocurrencies for dropdown
     top_10_cryptos = Cryptocurrency.query.order_by(Cryptocurrency.market_cap.desc()).limit(10).all()
 
-    # Fetch historical data for selected crypto
-    historical_data = (HistoricalData.query
-                       .join(Cryptocurrency)
-                       .filter(Cryptocurrency.coingecko_id == selected_crypto)
-                       .order_by(HistoricalData.date.asc())
-                       .all())
-
-    # Format historical data
-    dates = [data.date.strftime('%Y-%m-%d') for data in historical_data]
-    prices = [float(data.price) for data in historical_data]
-    market_caps = [float(data.market_cap) for data in historical_data]
-
+    # Chart series are loaded by the page itself from /trends/data
     return render_template('trends.html',
                            top_10_cryptos=top_10_cryptos,
-                           selected_crypto=selected_crypto,
-                           dates=dates, prices=prices, market_caps=market_caps)
+                           selected_crypto=selected_crypto)
 
 
 
 # **New API Route for Dynamic Chart Updates**
 @crypto_bp.route('/trends/data')
 def trends_data():
-    """Return JSON data for the selected cryptocurrency."""
-    selected_crypto = request.args.get('crypto')
+    """Return JSON data for the selected cryptocurrency.
 
-    historical_data = (HistoricalData.query
-                       .join(Cryptocurrency)
-                       .filter(Cryptocurrency.coingecko_id == selected_crypto)
-                       .order_by(HistoricalData.date.asc())
-                       .all())
+    Optional `from` / `to` (YYYY-MM-DD) limit the date range, and `points=N` returns an
+    LTTB downsample of at most N points so payloads stay bounded whatever the history length.
 
-    if not historical_data:
+    Bodies are cached per coin, range, resolution and data version, and tagged with an ETag
+    built from the same key, so repeat requests between ingestion runs are answered with a
+    304 or from memory.
+    """
+    selected_crypto = request.args.get('crypto')
+    try:
+        points = parse_int_arg('points')
+        start = parse_date_arg('from')
+        end = parse_date_arg('to')
+        check_date_range(start, end)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if points is not None and points < 3:
+        return jsonify({'error': "'points' must be at least 3"}), 400
+
+    def build():
+        # Columnar payload: epoch days plus float arrays, read without ORM entities
+        history = get_history(selected_crypto, fields=('price', 'market_cap'))
+        return downsample_history(history, points=points, start=start, end=end) if history else None
+
+    cache_key = f"trends:{selected_crypto}:{start}:{end}:{points}"
+    response = cached_json_response(trends_payload_cache, cache_key, get_data_version(), build)
+    if response is None:
         return jsonify({'error': 'No historical data found for this cryptocurrency'}), 404
+    return response
+
 
-    return jsonify({
-        'dates': [data.date.strftime('%Y-%m-%d') for data in historical_data],  # Fix date format
-        'prices': [float(data.price) for data in historical_data],
-        'market_caps': [float(data.market_cap) for data in historical_data]
-    })
\ No newline at end of file
+# Technical indicators for the selected cryptocurrency, next to the raw series above
+@crypto_bp.route('/trends/indicators')
+def trends_indicators():
+    """Return daily return, 7/30-day SMA, 30-day volatility and 14-day RSI as columnar JSON.
+
+    Accepts the same `crypto`, `from` and `to` arguments as /trends/data and is cached and
+    ETagged per data version the same way.
+    """
+    selected_crypto = request.args.get('crypto')
+    try:
+        start = parse_date_arg('from')
+        end = parse_date_arg('to')
+        check_date_range(start, end)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    def build():
+        return load_indicator_columns(selected_crypto, start=start, end=end) or None
+
+    cache_key = f"indicators:{selected_crypto}:{start}:{end}"
+    response = cached_json_response(trends_payload_cache, cache_key, get_data_version(), build)
+    if response is None:
+        return jsonify({'error': 'No indicators found for this cryptocurrency'}), 404
+    return response
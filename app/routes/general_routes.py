@@ -1,5 +1,6 @@
-from flask import Blueprint, render_template
+from flask import Blueprint, jsonify, render_template
 from app.models import HistoricalData
+from app.services.warmup_service import startup_state
 
 general_bp = Blueprint('general', __name__)
 
@@ -13,3 +14,14 @@ def about():
 def historical():
     historical_data = HistoricalData.query.order_by(HistoricalData.date.asc()).all()
     return render_template('historical.html', historical_data=historical_data)
+
+# Liveness - the process is up and serving; never touches the database
+@general_bp.route('/healthz')
+def healthz():
+    return jsonify({'status': 'ok', **startup_state.as_dict()})
+
+# Readiness - 503 until startup warmup has finished, so load balancers hold traffic back
+@general_bp.route('/readyz')
+def readyz():
+    state = startup_state.as_dict()
+    return jsonify({'status': 'ready' if state['ready'] else 'warming_up', **state}), 200 if state['ready'] else 503
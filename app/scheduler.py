@@ -1,45 +1,89 @@
+import atexit
+import datetime
+import os
+
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.blocking import BlockingScheduler
+from app.models import db
 from app.services.crypto_service import update_cryptocurrencies
-from app.services.coingecko_service import fetch_top_cryptos
+from app.utils.leader_lock import leader_lock
 from flask import current_app
 
-# Create a scheduler instance
+# Create a scheduler instance (only started in processes that opt in with RUN_SCHEDULER)
 scheduler = BackgroundScheduler()
 
-def scheduled_update():
-    """Fetches the latest cryptocurrency data and updates the database."""
-    print("Fetching latest cryptocurrency data...")
+def scheduled_update(app=None):
+    """Fetches the latest cryptocurrency data and updates the database, if this process is the leader."""
+    # Scheduler threads have no app context, so the job is handed the app explicitly
+    app = app or current_app._get_current_object()
+    if not leader_lock.acquire():
+        print("Another process holds the ingestion lock; skipping this update.")
+        return
 
-    # Ensure Flask app context is properly set
-    app = current_app._get_current_object()  #  Fix: Get Flask app instance
+    print("Fetching latest cryptocurrency data...")
     with app.app_context():
-        crypto_data = fetch_top_cryptos()
-        update_cryptocurrencies()  # Removed crypto_data argument to match function definition
+        update_cryptocurrencies()  # Walks the markets pages itself
         print("Cryptocurrency data updated successfully.")
 
+def elect_leader(target):
+    """Standby check: once the previous leader is gone, take over and run an update right away."""
+    if leader_lock.held():
+        return
+    if leader_lock.acquire():
+        print(f"Acquired the ingestion lock ({leader_lock.backend}); this process now runs updates.")
+        target.modify_job("crypto_update", next_run_time=datetime.datetime.now())
+
+def _add_jobs(target, app):
+    """Schedules the update job (first run immediately, off the caller's thread) and the leader check."""
+    with app.app_context():
+        leader_lock.configure(
+            db.engine,
+            app.config["LEADER_LOCK_PATH"] or os.path.join(app.instance_path, "ingest.lock"),
+            app.config["LEADER_LOCK_KEY"],
+        )
+
+    if not target.get_job("crypto_update"):
+        print("Adding scheduled cryptocurrency update job...")
+        target.add_job(scheduled_update, 'interval', minutes=app.config["UPDATE_INTERVAL_MINUTES"],
+                       id="crypto_update", args=[app], next_run_time=datetime.datetime.now(),
+                       max_instances=1, coalesce=True)
+    if not target.get_job("leader_election"):
+        target.add_job(elect_leader, 'interval', seconds=app.config["LEADER_RETRY_SECONDS"],
+                       id="leader_election", args=[target], max_instances=1, coalesce=True)
+
 def start_scheduler(app):
-    """Starts the background scheduler for periodic cryptocurrency updates."""
+    """Starts the background scheduler in this process (opt-in via RUN_SCHEDULER; see worker.py)."""
     global scheduler
 
+    _add_jobs(scheduler, app)
     if not scheduler.running:
         print("Starting APScheduler...")
         scheduler.start()
         print("APScheduler is now running.")
 
-    # Ensure the scheduled job exists
-    existing_jobs = scheduler.get_jobs()
-    if not any(job.id == "crypto_update" for job in existing_jobs):
-        print("Adding scheduled cryptocurrency update job...")
-        scheduler.add_job(scheduled_update, 'interval', minutes=30, id="crypto_update")
-
-    # Run an initial update on startup
-    with app.app_context():  # Fix: Ensures app context exists
-        print("Running initial cryptocurrency update on startup...")
-        scheduled_update()
-
-    @app.teardown_appcontext
-    def shutdown_scheduler(exception=None):
-        """Shuts down the scheduler when the app is terminated."""
-        if scheduler.running:
-            print("Shutting down APScheduler...")
-            scheduler.shutdown()
+    # Stop with the process, not with every request's app context
+    atexit.register(shutdown_scheduler)
+
+def shutdown_scheduler():
+    """Shuts down the scheduler and gives up leadership when the process exits."""
+    if scheduler.running:
+        print("Shutting down APScheduler...")
+        scheduler.shutdown(wait=False)
+    leader_lock.release()
+
+def run_worker(app):
+    """
+    Runs ingestion in the foreground until interrupted; the entry point for `python worker.py`.
+
+    Any number of workers may run: one holds the leader lock and runs the jobs, the rest
+    stay on standby and take over within LEADER_RETRY_SECONDS if it goes away.
+    """
+    worker = BlockingScheduler()
+    _add_jobs(worker, app)
+    print(f"Ingestion worker {os.getpid()} started; updating every {app.config['UPDATE_INTERVAL_MINUTES']} minutes.")
+    try:
+        worker.start()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        leader_lock.release()
@@ -0,0 +1,80 @@
+import numpy as np
+from sqlalchemy import select
+
+from app.models import db, Cryptocurrency
+from app.services.history_service import get_history
+
+
+def tracked_coin_ids():
+    """coingecko ids of every tracked cryptocurrency, largest market cap first."""
+    return list(db.session.scalars(
+        select(Cryptocurrency.coingecko_id).order_by(Cryptocurrency.market_cap.desc())
+    ))
+
+
+def return_matrix(coingecko_ids, window):
+    """
+    Builds a `(days, coins)` matrix of daily returns over the last `window` days.
+
+    The date axis ends at the newest day any coin has data for. A coin's return for a day is
+    only defined when the previous calendar day is also stored, so gaps and coins that start
+    late leave NaN rather than a multi-day return.
+
+    Returns `(first_epoch_day, coins_with_data, matrix)`.
+    """
+    histories = {}
+    for coingecko_id in coingecko_ids:
+        history = get_history(coingecko_id, fields=("price",))
+        if history and len(history["epoch_days"]) > 1:
+            histories[coingecko_id] = (np.asarray(history["epoch_days"], dtype=np.int64),
+                                       np.asarray(history["prices"], dtype=np.float64))
+
+    if not histories:
+        return None, [], np.empty((0, 0))
+
+    end = int(max(days[-1] for days, _ in histories.values()))
+    start = end - window + 1
+    coins = list(histories)
+    matrix = np.full((window, len(coins)), np.nan)
+
+    for column, coingecko_id in enumerate(coins):
+        days, prices = histories[coingecko_id]
+        consecutive = np.flatnonzero(np.diff(days) == 1) + 1
+        returns = prices[consecutive] / prices[consecutive - 1] - 1
+        slots = days[consecutive] - start
+        in_window = slots >= 0
+        matrix[slots[in_window], column] = returns[in_window]
+
+    return start, coins, matrix
+
+
+def pairwise_covariance(matrix, min_periods=2):
+    """
+    Covariance and correlation of every column pair using pairwise-complete observations.
+
+    Each pair only uses the days where both columns have a value. All sums are computed
+    for every pair at once with matrix products over the NaN mask, so the cost is a handful
+    of `(coins x days) @ (days x coins)` products. Pairs with fewer than `min_periods`
+    shared days are NaN.
+
+    Returns `(covariance, correlation, observations)`, each `(coins, coins)`.
+    """
+    present = ~np.isnan(matrix)
+    mask = present.astype(np.float64)
+    values = np.where(present, matrix, 0.0)
+
+    counts = mask.T @ mask                   # shared observations per pair
+    sums = values.T @ mask                   # sum of column i over days where j is present
+    squares = (values ** 2).T @ mask         # sum of squares of column i, same days
+    products = values.T @ values             # sum of x_i * x_j over shared days
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        covariance = (products - sums * sums.T / counts) / (counts - 1)
+        variance = (squares - sums ** 2 / counts) / (counts - 1)
+        correlation = covariance / np.sqrt(variance * variance.T)
+
+    too_few = counts < max(min_periods, 2)
+    covariance[too_few] = np.nan
+    correlation[too_few] = np.nan
+    np.clip(correlation, -1.0, 1.0, out=correlation)
+    return covariance, correlation, counts.astype(np.int64)
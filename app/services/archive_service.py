@@ -0,0 +1,75 @@
+import datetime
+
+import numpy as np
+from sqlalchemy import Float, cast, delete, select
+
+from app.models import db, Cryptocurrency, HistoricalData
+from app.services.cold_store import cold_store
+from app.services.timeseries_store import merge_columns
+from app.utils.timeseries import date_to_epoch_day, epoch_day_to_date
+
+
+def archive_boundary(archive_after_days, segment_days, today=None):
+    """
+    First day that stays in `historical_data`: the start of the segment block holding the
+    day `archive_after_days` ago, so only whole blocks are ever archived.
+    """
+    today = today or datetime.datetime.now(datetime.timezone.utc).date()
+    cutoff_day = date_to_epoch_day(today) - archive_after_days
+    return epoch_day_to_date(cutoff_day - cutoff_day % segment_days)
+
+
+def archive_history(archive_after_days, segment_days, today=None):
+    """
+    Moves `historical_data` rows older than `archive_after_days` into cold-store segments of
+    `segment_days` days each, one coin at a time.
+
+    Each coin's old rows are merged into its segments (rows already archived for the same
+    day are replaced), the segments are written, and only then are the rows deleted and the
+    deletion committed. A crash in between leaves the rows in both tiers, where readers
+    prefer the database copy, and the next run archives them again.
+
+    Returns `(coins, rows)` archived.
+    """
+    boundary = archive_boundary(archive_after_days, segment_days, today)
+    candidates = db.session.execute(
+        select(Cryptocurrency.id, Cryptocurrency.coingecko_id)
+        .where(Cryptocurrency.id.in_(
+            select(HistoricalData.cryptocurrency_id).where(HistoricalData.date < boundary).distinct()
+        ))
+    ).all()
+
+    archived = 0
+    for crypto_id, coingecko_id in candidates:
+        rows = db.session.execute(
+            select(HistoricalData.date, cast(HistoricalData.price, Float),
+                   cast(HistoricalData.market_cap, Float), cast(HistoricalData.volume, Float))
+            .where(HistoricalData.cryptocurrency_id == crypto_id, HistoricalData.date < boundary)
+            .order_by(HistoricalData.date)
+        ).all()
+        if not rows:
+            continue
+
+        dates, prices, market_caps, volumes = zip(*rows)
+        columns = {
+            "epoch_days": np.fromiter((date_to_epoch_day(d) for d in dates), dtype=np.int32, count=len(dates)),
+            "prices": np.asarray(prices, dtype=np.float64),
+            "market_caps": np.asarray(market_caps, dtype=np.float64),
+            "volumes": np.asarray(volumes, dtype=np.float64),
+        }
+
+        blocks = columns["epoch_days"] // segment_days
+        for block in np.unique(blocks):
+            first_day, last_day = int(block) * segment_days, (int(block) + 1) * segment_days - 1
+            in_block = blocks == block
+            new = {name: column[in_block] for name, column in columns.items()}
+            cold_store.write_segment(coingecko_id, first_day, last_day,
+                                     merge_columns(cold_store.read(coingecko_id, first_day, last_day), new))
+
+        db.session.execute(delete(HistoricalData).where(HistoricalData.cryptocurrency_id == crypto_id,
+                                                        HistoricalData.date < boundary))
+        db.session.commit()
+        archived += len(rows)
+
+    return len(candidates), archived
+
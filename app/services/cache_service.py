@@ -0,0 +1,171 @@
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from sqlalchemy import update
+
+from app.models import db, DataVersion
+
+# Dataset bumped by the ingestion pipeline after every commit
+MARKET_DATA = "market_data"
+
+_version_lock = threading.Lock()
+_version_cache = {}  # name -> (version, read_at)
+
+
+def get_data_version(name=MARKET_DATA):
+    """
+    Returns the current version of a dataset.
+
+    The value lives in `data_versions` so every process sees the same number. Reads are
+    reused for `DATA_VERSION_TTL` seconds, so a traffic spike costs one lookup per interval.
+    """
+    ttl = current_app.config.get("DATA_VERSION_TTL", 2)
+    now = time.monotonic()
+
+    with _version_lock:
+        cached = _version_cache.get(name)
+    if cached and now - cached[1] < ttl:
+        return cached[0]
+
+    row = db.session.get(DataVersion, name)
+    version = row.version if row else 0
+
+    with _version_lock:
+        _version_cache[name] = (version, now)
+    return version
+
+
+def bump_data_version(name=MARKET_DATA):
+    """
+    Increments a dataset's version in the current transaction. Call right before committing
+    new data so caches keyed on the version are invalidated by that commit.
+    """
+    result = db.session.execute(
+        update(DataVersion)
+        .where(DataVersion.name == name)
+        .values(version=DataVersion.version + 1, updated_at=db.func.current_timestamp())
+    )
+    if result.rowcount == 0:
+        db.session.add(DataVersion(name=name, version=1))
+
+    with _version_lock:
+        _version_cache.pop(name, None)  # This process sees the new version on its next read
+
+
+class PayloadCache:
+    """
+    Thread-safe LRU of serialized payloads tagged with the data version they were built from.
+
+    Entries from an older version are never returned, and seeing a newer version drops them,
+    so the cache stays bounded by `max_entries` live payloads.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _sync_version(self, version):
+        if version != self.version:
+            self._entries.clear()
+            self.version = version
+
+    def get(self, key, version):
+        with self._lock:
+            self._sync_version(version)
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, version, value):
+        with self._lock:
+            self._sync_version(version)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "version": self.version,
+                    "hits": self.hits, "misses": self.misses}
+
+
+class FragmentCache(PayloadCache):
+    """
+    Rendered template fragments, invalidated by the data version like `PayloadCache` and
+    additionally expiring after a per-fragment TTL, which bounds staleness for edits that do
+    not bump the version. Hits and misses are counted per fragment.
+
+    Concurrent misses on the same key render once; the other requests wait for that result,
+    so a traffic spike right after an ingest does not render the same page N times. Keys map
+    onto a fixed set of render locks that are never replaced, so every request for a key
+    waits on the same one; two keys sharing a lock only render one after the other.
+    """
+
+    def __init__(self, max_entries=512, lock_stripes=64):
+        super().__init__(max_entries)
+        self.ttls = {}
+        self.counters = {}  # fragment -> {"hits": n, "misses": n}
+        self._render_locks = [threading.Lock() for _ in range(lock_stripes)]
+
+    def configure(self, ttls):
+        """Sets `{fragment: seconds}` TTLs; fragments without one only expire with the version."""
+        self.ttls = dict(ttls)
+
+    def _lookup(self, fragment, key, version, count):
+        with self._lock:
+            self._sync_version(version)
+            entry = self._entries.get(key)
+            fresh = entry is not None and (entry[0] is None or entry[0] > time.monotonic())
+            if count:
+                counter = self.counters.setdefault(fragment, {"hits": 0, "misses": 0})
+                counter["hits" if fresh else "misses"] += 1
+                if fresh:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+            if not fresh:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def render(self, fragment, key, version, render):
+        """Returns the cached `fragment` for `key` at `version`, calling `render()` on a miss."""
+        cache_key = f"{fragment}:{key}"
+        value = self._lookup(fragment, cache_key, version, count=True)
+        if value is not None:
+            return value
+
+        with self._render_locks[hash(cache_key) % len(self._render_locks)]:
+            value = self._lookup(fragment, cache_key, version, count=False)  # Rendered while we waited
+            if value is None:
+                value = render()
+                ttl = self.ttls.get(fragment)
+                self.put(cache_key, version, (time.monotonic() + ttl if ttl else None, value))
+        return value
+
+    def stats(self):
+        stats = super().stats()
+        with self._lock:
+            stats["fragments"] = {fragment: dict(counter) for fragment, counter in self.counters.items()}
+        return stats
+
+
+# JSON bodies served by /trends/data, keyed by coin
+trends_payload_cache = PayloadCache()
+
+# JSON bodies served by the /api blueprint, keyed by normalized query
+api_payload_cache = PayloadCache()
+
+# Rendered HTML of the index table and currency detail sections; TTLs set in create_app
+fragment_cache = FragmentCache()
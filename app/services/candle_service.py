@@ -0,0 +1,99 @@
+import numpy as np
+from sqlalchemy import Float, case, cast, select
+
+from app.models import db, Cryptocurrency, PriceCandle
+from app.services.storage_service import dialect_insert
+from app.utils.timeseries import bucket_runs, datetime_to_epoch_seconds, epoch_ms_to_datetime
+
+# Candle intervals and their width in seconds
+CANDLE_INTERVALS = {"1h": 3600, "4h": 14400, "1d": 86400}
+
+# Price columns of a candle, in the order the API returns them
+OHLC_COLUMNS = ("open", "high", "low", "close")
+
+
+def build_candles(ticks, interval):
+    """
+    OHLCV candles at `interval` for a batch of intraday points (`price_ticks` row dicts), as
+    `price_candles` rows.
+
+    One vectorized pass over all coins: points are sorted by coin and time, split into runs
+    per candle, and each run's first, last, highest and lowest price are taken with
+    `reduceat`. Volume is the 24h volume at the closing point.
+    """
+    if not ticks:
+        return []
+
+    order, starts, ends, coins, buckets = bucket_runs(
+        [tick["cryptocurrency_id"] for tick in ticks],
+        [datetime_to_epoch_seconds(tick["ts"]) for tick in ticks],
+        CANDLE_INTERVALS[interval],
+    )
+    prices = np.fromiter((float(ticks[index]["price"]) for index in order), dtype=np.float64, count=len(order))
+    highs = np.maximum.reduceat(prices, starts)
+    lows = np.minimum.reduceat(prices, starts)
+
+    candles = []
+    for coin, bucket, first, last, high, low in zip(coins.tolist(), buckets.tolist(), order[starts].tolist(),
+                                                    order[ends - 1].tolist(), highs.tolist(), lows.tolist()):
+        candles.append({
+            "cryptocurrency_id": coin, "interval": interval, "bucket": epoch_ms_to_datetime(bucket * 1000),
+            "open": ticks[first]["price"], "high": high, "low": low, "close": ticks[last]["price"],
+            "volume": ticks[last]["volume"], "open_at": ticks[first]["ts"], "close_at": ticks[last]["ts"],
+        })
+    return candles
+
+
+def merge_candles(rows):
+    """
+    Upserts candle rows, combining them with any stored candle for the same bucket.
+
+    The earlier open, the later close (and its volume), the higher high and the lower low
+    win, so only the candles the new points fall in are touched - normally just the open
+    one - and merging the same points twice changes nothing. Runs as one cached executemany
+    (see `merge_rollups`). Does not commit.
+    """
+    if not rows:
+        return
+    table = PriceCandle.__table__
+    stmt = dialect_insert(table)
+    new, current = stmt.excluded, table.c
+    opens_earlier = new.open_at < current.open_at
+    closes_later = new.close_at >= current.close_at
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[current.cryptocurrency_id, current.interval, current.bucket],
+        set_={
+            "open": case((opens_earlier, new.open), else_=current.open),
+            "open_at": case((opens_earlier, new.open_at), else_=current.open_at),
+            "high": case((new.high > current.high, new.high), else_=current.high),
+            "low": case((new.low < current.low, new.low), else_=current.low),
+            "close": case((closes_later, new.close), else_=current.close),
+            "volume": case((closes_later, new.volume), else_=current.volume),
+            "close_at": case((closes_later, new.close_at), else_=current.close_at),
+        },
+    )
+    db.session.execute(stmt, rows)
+
+
+def load_candles(coingecko_id, interval, start, end):
+    """
+    Reads one coin's stored candles starting in `[start, end]` as columns:
+    `{"timestamps": [bucket start, epoch seconds], "opens", "highs", "lows", "closes", "volumes"}`.
+    Returns None when there are none.
+    """
+    rows = db.session.execute(
+        select(PriceCandle.bucket, *(cast(getattr(PriceCandle, column), Float) for column in (*OHLC_COLUMNS, "volume")))
+        .join(Cryptocurrency, Cryptocurrency.id == PriceCandle.cryptocurrency_id)
+        .where(Cryptocurrency.coingecko_id == coingecko_id, PriceCandle.interval == interval,
+               PriceCandle.bucket >= start, PriceCandle.bucket <= end)
+        .order_by(PriceCandle.bucket)
+    ).all()
+
+    if not rows:
+        return None
+
+    buckets, *values = zip(*rows)
+    candles = {"timestamps": [datetime_to_epoch_seconds(bucket) for bucket in buckets]}
+    for column, series in zip((*OHLC_COLUMNS, "volume"), values):
+        candles[f"{column}s"] = list(series)
+    return candles
@@ -0,0 +1,37 @@
+import datetime
+
+from sqlalchemy import delete, func, select
+
+from app.models import db, Cryptocurrency, PriceChange
+
+
+def latest_change_seq():
+    """Sequence number of the newest `price_changes` entry (0 when the log is empty)."""
+    return db.session.scalar(select(func.max(PriceChange.seq))) or 0
+
+
+def oldest_change_seq():
+    """Sequence number of the oldest retained entry, or None when the log is empty."""
+    return db.session.scalar(select(func.min(PriceChange.seq)))
+
+
+def read_changes(after_seq, limit=1000):
+    """
+    Entries logged after `after_seq`, oldest first, as `(seq, coingecko_id, changed_at, fields)`.
+
+    A primary-key range scan, so tailing the log costs the same however long it is. Pass the
+    last `seq` returned to read the next batch.
+    """
+    return db.session.execute(
+        select(PriceChange.seq, Cryptocurrency.coingecko_id, PriceChange.changed_at, PriceChange.fields)
+        .join(Cryptocurrency, Cryptocurrency.id == PriceChange.cryptocurrency_id)
+        .where(PriceChange.seq > after_seq)
+        .order_by(PriceChange.seq)
+        .limit(limit)
+    ).all()
+
+
+def prune_changelog(retention_days):
+    """Deletes entries older than `retention_days`. Does not commit. Returns the number removed."""
+    cutoff = datetime.datetime.utcnow() - datetime.timedelta(days=retention_days)
+    return db.session.execute(delete(PriceChange).where(PriceChange.changed_at < cutoff)).rowcount
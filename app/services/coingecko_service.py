@@ -3,13 +3,20 @@ import time
 
 COINGECKO_API_URL = "https://api.coingecko.com/api/v3/coins/markets"
 HISTORICAL_DATA_URL = "https://api.coingecko.com/api/v3/coins/{id}/market_chart"
+HISTORICAL_RANGE_URL = "https://api.coingecko.com/api/v3/coins/{id}/market_chart/range"
 
-def fetch_top_cryptos():
-    """Fetch top 10 cryptocurrencies from CoinGecko API with rate limit handling."""
-    params = {"vs_currency": "usd", "order": "market_cap_desc", "per_page": 10, "page": 1}
+# Largest page the markets endpoint serves
+MAX_MARKETS_PAGE_SIZE = 250
+
+def fetch_top_cryptos(per_page=10, page=1):
+    """Fetch top 10 cryptocurrencies from CoinGecko API with rate limit handling.
+
+    `per_page` and `page` select another slice of the market-cap ranking.
+    """
+    params = {"vs_currency": "usd", "order": "market_cap_desc", "per_page": per_page, "page": page}
     
     print("Fetching latest cryptocurrency data...")
-    data = safe_request(COINGECKO_API_URL, params=params)
+    data = safe_request(COINGECKO_API_URL, params=params, endpoint="markets")
 
     if not data or not isinstance(data, list):
         print("Failed to fetch top cryptocurrencies. Using last known data if available.")
@@ -19,13 +26,53 @@ def fetch_top_cryptos():
     return data
 
 
+def iter_market_pages(universe_size, page_size=MAX_MARKETS_PAGE_SIZE):
+    """
+    Yield the top `universe_size` coins by market cap one markets page at a time.
+
+    Pages are requested lazily, so callers can persist each page before the next is fetched,
+    and every request goes through the shared `markets` rate budget. Stops early when the
+    API returns a short or empty page.
+    """
+    page_size = min(page_size, MAX_MARKETS_PAGE_SIZE, universe_size)
+    remaining = universe_size
+    page = 1
+
+    while remaining > 0:
+        data = fetch_top_cryptos(per_page=page_size, page=page)
+        if not data:
+            return
+
+        yield data[:remaining]
+        remaining -= len(data)
+        if len(data) < page_size:
+            return
+        page += 1
+
+
 def fetch_historical_data(coingecko_id, days=30, retries=3, wait=5):
     """Fetch historical market data (price, market cap, volume) for a given cryptocurrency with rate-limit handling."""
     url = HISTORICAL_DATA_URL.format(id=coingecko_id)
     params = {"vs_currency": "usd", "days": days}
+    return _fetch_market_chart(coingecko_id, url, params, retries, wait)
+
+
+def fetch_historical_range(coingecko_id, from_timestamp, to_timestamp, retries=3, wait=5):
+    """
+    Fetch historical market data between two UNIX timestamps (seconds).
+
+    Uses the `market_chart/range` endpoint, so only the requested gap is downloaded.
+    CoinGecko picks the granularity from the span: 5-minute under a day, hourly up to 90 days, daily beyond.
+    """
+    url = HISTORICAL_RANGE_URL.format(id=coingecko_id)
+    params = {"vs_currency": "usd", "from": int(from_timestamp), "to": int(to_timestamp)}
+    return _fetch_market_chart(coingecko_id, url, params, retries, wait)
+
 
+def _fetch_market_chart(coingecko_id, url, params, retries, wait):
+    """Request a market chart payload, retrying until it has all three series."""
     for attempt in range(retries):
-        data = safe_request(url, params=params)
+        data = safe_request(url, params=params, endpoint="market_chart")
 
         # Validate response
         if data and all(key in data for key in ["prices", "market_caps", "total_volumes"]):
@@ -43,7 +90,7 @@ def fetch_crypto_by_id(coingecko_id):
     """Fetch specific cryptocurrency details using CoinGecko ID."""
     params = {"vs_currency": "usd", "ids": coingecko_id}
 
-    data = safe_request(COINGECKO_API_URL, params=params)
+    data = safe_request(COINGECKO_API_URL, params=params, endpoint="markets")
 
     if not data or not isinstance(data, list) or len(data) == 0:
         print(f"Failed to fetch details for {coingecko_id}.")
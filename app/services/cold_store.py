@@ -0,0 +1,125 @@
+import os
+import shutil
+import threading
+
+import numpy as np
+
+from app.services.timeseries_store import SERIES_COLUMNS, merge_columns
+
+
+class ColdStore:
+    """
+    Archived `historical_data` as compressed, per-coin columnar segment files.
+
+    Each coin has a directory of segments named `<first_day>_<last_day>.npz` (epoch days),
+    every one holding the `SERIES_COLUMNS` arrays of one fixed block of days, deflate
+    compressed. A segment is expanded the first time it is read into plain `.npy` files in
+    a sibling directory stamped with the segment's mtime, and those are memory-mapped, so
+    every process on the host shares one copy through the page cache. Expansions are only a
+    cache: rewriting a segment makes them stale and they are rebuilt on the next read.
+    """
+
+    def __init__(self):
+        self.path = None
+        self._opened = {}  # expansion directory -> {column: memory-mapped array}
+        self._lock = threading.Lock()
+
+    def configure(self, path):
+        self.path = path
+
+    def _coin_path(self, coingecko_id):
+        # Ids reach here from query strings; never let one name a path outside the store
+        if not self.path or not coingecko_id or coingecko_id.startswith(".") or "/" in coingecko_id \
+                or os.sep in coingecko_id:
+            return None
+        return os.path.join(self.path, coingecko_id)
+
+    def coins(self):
+        """Coins with at least one segment."""
+        if not self.path or not os.path.isdir(self.path):
+            return []
+        return sorted(name for name in os.listdir(self.path) if self.segments(name))
+
+    def segments(self, coingecko_id):
+        """`(first_day, last_day, file name)` for each of a coin's segments, oldest first."""
+        directory = self._coin_path(coingecko_id)
+        if not directory or not os.path.isdir(directory):
+            return []
+        segments = []
+        for name in os.listdir(directory):
+            if name.endswith(".npz"):
+                first, last = name[:-len(".npz")].split("_")
+                segments.append((int(first), int(last), name))
+        return sorted(segments)
+
+    def read(self, coingecko_id, start_day=None, end_day=None):
+        """
+        A coin's archived rows between two epoch days (inclusive, either may be None) as
+        `{column: ndarray}`, or None when no segment overlaps. Arrays are read-only; a range
+        inside one segment is returned as memory-mapped views without copying.
+        """
+        parts = [self._open(coingecko_id, name) for first, last, name in self.segments(coingecko_id)
+                 if (start_day is None or last >= start_day) and (end_day is None or first <= end_day)]
+        if not parts:
+            return None
+
+        columns = parts[0]
+        for part in parts[1:]:
+            columns = merge_columns(columns, part)  # Also orders segments written with another block size
+        days = columns["epoch_days"]
+        lo = np.searchsorted(days, start_day, side="left") if start_day is not None else 0
+        hi = np.searchsorted(days, end_day, side="right") if end_day is not None else len(days)
+        if lo >= hi:
+            return None
+        return {name: column[lo:hi] for name, column in columns.items()}
+
+    def write_segment(self, coingecko_id, first_day, last_day, columns):
+        """
+        Writes (or replaces) the segment for days `[first_day, last_day]` from `columns`,
+        which must be ordered by day. The file is swapped in once fully written.
+        """
+        directory = self._coin_path(coingecko_id)
+        os.makedirs(directory, exist_ok=True)
+        stem = f"{first_day}_{last_day}"
+        path = os.path.join(directory, f"{stem}.npz")
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(f, **{name: np.asarray(columns[name], dtype=dtype)
+                                      for name, dtype in SERIES_COLUMNS.items()})
+        os.replace(tmp_path, path)
+
+        # Processes that mapped the old expansion keep their (unlinked) files until they reopen
+        for name in os.listdir(directory):
+            if name.startswith(f"{stem}.") and not name.endswith((".npz", ".tmp")):
+                shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+        return path
+
+    def _open(self, coingecko_id, name):
+        segment = os.path.join(self._coin_path(coingecko_id), name)
+        expanded = f"{segment[:-len('.npz')]}.{os.stat(segment).st_mtime_ns}"
+        with self._lock:
+            columns = self._opened.get(expanded)
+            if columns is not None:
+                return columns
+
+            if not os.path.isdir(expanded):
+                tmp_path = f"{expanded}.{os.getpid()}.tmp"
+                shutil.rmtree(tmp_path, ignore_errors=True)
+                os.makedirs(tmp_path)
+                with np.load(segment) as archive:
+                    for column in SERIES_COLUMNS:
+                        np.save(os.path.join(tmp_path, f"{column}.npy"), archive[column])
+                try:
+                    os.rename(tmp_path, expanded)
+                except OSError:
+                    shutil.rmtree(tmp_path, ignore_errors=True)  # Another process expanded it first
+
+            columns = {column: np.load(os.path.join(expanded, f"{column}.npy"), mmap_mode="r")
+                       for column in SERIES_COLUMNS}
+            self._opened[expanded] = columns
+            return columns
+
+
+# Process-wide cold tier; its directory is set in create_app
+cold_store = ColdStore()
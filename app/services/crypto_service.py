@@ -1,75 +1,278 @@
-from app.models import db, Cryptocurrency, HistoricalData
+from app.models import db, HistoricalData
 from sqlalchemy import func
-from sqlalchemy.dialects.postgresql import insert
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from flask import current_app
 import time
 import datetime  
-from app.services.coingecko_service import fetch_historical_data, fetch_top_cryptos  
-from app.utils.helpers import format_date 
+from app.services.archive_service import archive_history
+from app.services.cache_service import bump_data_version
+from app.services.changelog_service import prune_changelog
+from app.services.coingecko_service import fetch_historical_data, fetch_historical_range, iter_market_pages
+from app.services.indicator_service import update_indicators
+from app.services.tick_service import market_chart_ticks, prune_intraday, record_ticks
+from app.services.timeseries_store import timeseries_store
+from app.services.storage_service import bulk_insert_historical, upsert_cryptocurrencies
+from app.utils.http_client import http_client
+from app.utils.timeseries import align_daily
 
+# Per-coin lines printed after a backfill (slowest first); failures are always listed
+BACKFILL_REPORT_LINES = 20
 
-def update_cryptocurrencies():
-    """Fetch and update the top 10 cryptocurrencies from CoinGecko API."""
-    retry_attempts = 3  # Limit retry attempts to avoid infinite loop
 
-    for attempt in range(retry_attempts):
-        crypto_data = fetch_top_cryptos()
-        if crypto_data:
-            break  # Exit loop if request succeeds
-        print(f"Rate limit exceeded. Retrying in 60 seconds... (Attempt {attempt + 1}/{retry_attempts})")
-        time.sleep(60)  # **Wait before retrying**
+def update_cryptocurrencies(crypto_data=None):
+    """Fetch and update the top cryptocurrencies from CoinGecko API.
+
+    Walks the markets ranking page by page up to `MARKET_UNIVERSE_SIZE` coins, upserting and
+    committing each page as it arrives, so memory stays flat however many coins are tracked.
+    Callers that already hold a fresh markets payload can pass it in as `crypto_data`
+    to skip fetching.
+    """
+    config = current_app.config
+    if crypto_data:
+        pages = [crypto_data]
     else:
-        print("Failed to fetch top cryptocurrencies after multiple attempts.")
+        pages = iter_market_pages(config.get("MARKET_UNIVERSE_SIZE", 10), config.get("MARKET_PAGE_SIZE", 250))
+
+    stored = []  # Only (coingecko_id, id) pairs are kept across pages
+    page_count = changed = 0
+    started = time.perf_counter()
+    try:
+        for page in pages:
+            # Only new or changed coins are written, each with a price_changes entry and a tick
+            page_stored, page_changed, ticks = upsert_cryptocurrencies(page)
+            record_ticks(ticks)
+            stored.extend(page_stored)
+            if page_changed:
+                bump_data_version()
+            db.session.commit()
+            page_count += 1
+            changed += page_changed
+    except Exception as e:
+        db.session.rollback()
+        print(f"Stopped fetching markets after {page_count} pages: {e}")
+
+    if not stored:
+        print("Failed to fetch top cryptocurrencies.")
         return
 
-    existing_cryptos = {c.coingecko_id: c for c in Cryptocurrency.query.all()}
-    new_cryptos = []
-
-    for coin in crypto_data:
-        print(f"Processing coin: {coin['name']} ({coin['id']})")
-
-        currency = existing_cryptos.get(coin['id'])
-        if not currency:
-            print(f"Adding new cryptocurrency: {coin['name']}")
-            currency = Cryptocurrency(
-                coingecko_id=coin['id'],
-                name=coin['name'],
-                current_price=coin['current_price'],
-                market_cap=coin['market_cap'],
-                volume=coin['total_volume'],
-                circulating_supply=coin['circulating_supply'],
-                total_supply=coin.get('total_supply'),
-                max_supply=coin.get('max_supply'),
-                last_updated=datetime.datetime.utcnow()  # Use actual timestamp
-            )
-            db.session.add(currency)
+    elapsed = time.perf_counter() - started
+    print(f"Cryptocurrency updates complete: {len(stored)} coins from {page_count} pages, {changed} changed, "
+          f"in {elapsed:.2f}s ({page_count / elapsed:.2f} pages/s).")
+
+    pruned = prune_changelog(config.get("CHANGELOG_RETENTION_DAYS", 7))
+    pruned_ticks, pruned_hourly = prune_intraday()
+    db.session.commit()
+    if pruned:
+        print(f"Pruned {pruned} old price_changes entries.")
+    if pruned_ticks or pruned_hourly:
+        print(f"Pruned {pruned_ticks} intraday ticks and {pruned_hourly} hourly rollups/candles past retention.")
+
+    # Fetch historical data
+    backfill_historical_data(stored)
+
+    # Fold the new rows into the in-memory store and persist it for the next boot
+    added = timeseries_store.sync()
+    archive_old_history()
+    snapshot_path = current_app.config.get("TIMESERIES_SNAPSHOT_PATH")
+    if snapshot_path:
+        timeseries_store.save_snapshot(snapshot_path)
+    print(f"Time-series store updated with {added} rows.")
+
+    # Extend the derived indicators over the newly appended days only
+    indicator_rows = update_indicators(stored)
+    if indicator_rows:
+        bump_data_version()
+    db.session.commit()
+    print(f"Technical indicators updated: {indicator_rows} new rows.")
+
+
+def archive_old_history():
+    """
+    Moves history past `ARCHIVE_AFTER_DAYS` to the cold store. Runs after the time-series
+    store has synced, so the snapshot saved next still holds the archived rows.
+
+    The age is never below `HISTORY_DAYS`: backfills compare against the days stored in the
+    database, so anything they may fetch again has to stay there.
+    """
+    config = current_app.config
+    if not config.get("ARCHIVE_AFTER_DAYS"):
+        return
+    started = time.perf_counter()
+    archive_after_days = max(config["ARCHIVE_AFTER_DAYS"], config.get("HISTORY_DAYS", 30) + 1)
+    try:
+        coins, rows = archive_history(archive_after_days, config.get("ARCHIVE_SEGMENT_DAYS", 90))
+    except Exception as e:
+        db.session.rollback()
+        print(f"Archiving old history failed: {e}")
+        return
+    if rows:
+        print(f"Archived {rows} historical rows of {coins} coins to cold storage "
+              f"in {time.perf_counter() - started:.2f}s.")
+
+
+def _fetch_history_job(coingecko_id, crypto_id, since=None, days=30, until=None):
+    """
+    Worker: fetch one coin's market chart and time the round trip. Never raises.
+
+    With `since` (the newest stored date) only the missing days up to `until` (UNIX seconds,
+    default now) are requested through the range endpoint; otherwise the full `days` window
+    is fetched.
+    """
+    started = time.perf_counter()
+    try:
+        if since is None:
+            data = fetch_historical_data(coingecko_id, days=days)
         else:
-            print(f"🔄 Updating {coin['name']} in database.")
-            currency.current_price = coin['current_price']
-            currency.market_cap = coin['market_cap']
-            currency.volume = coin['total_volume']
-            currency.circulating_supply = coin['circulating_supply']
-            currency.total_supply = coin.get('total_supply')
-            currency.max_supply = coin.get('max_supply')
-            currency.last_updated = datetime.datetime.utcnow()  
+            gap_start = datetime.datetime.combine(since + datetime.timedelta(days=1), datetime.time(),
+                                                  tzinfo=datetime.timezone.utc)
+            data = fetch_historical_range(coingecko_id, gap_start.timestamp(), until or time.time())
+        error = None if data else "no data returned"
+    except Exception as e:
+        data, error = None, str(e)
 
-        new_cryptos.append(currency)
+    return {
+        "coingecko_id": coingecko_id,
+        "crypto_id": crypto_id,
+        "mode": "full" if since is None else "range",
+        "data": data,
+        "error": error,
+        "fetch_seconds": time.perf_counter() - started,
+    }
 
-    db.session.commit()  # Fix: Commit only once after the loop
-    print("Cryptocurrency updates complete.")
 
-    # Fetch historical data
-    for coin in new_cryptos:
-        update_historical_data(coin.coingecko_id, coin.id)
+def latest_history_dates(crypto_ids):
+    """Returns `{crypto_id: newest stored HistoricalData.date}` in one grouped query."""
+    rows = (db.session.query(HistoricalData.cryptocurrency_id, func.max(HistoricalData.date))
+            .filter(HistoricalData.cryptocurrency_id.in_(crypto_ids))
+            .group_by(HistoricalData.cryptocurrency_id)
+            .all())
+    return {crypto_id: latest for crypto_id, latest in rows}
+
+
+def backfill_historical_data(coins, max_workers=None, incremental=None):
+    """
+    Fetch historical data for many coins concurrently, then write it from this thread.
+
+    - `coins`: iterable of `(coingecko_id, crypto_id)` pairs
+    - `max_workers`: size of the fetch pool; it bounds how many CoinGecko requests are
+      in flight at once (default: `HISTORY_FETCH_WORKERS` from config)
+    - `incremental`: only fetch days after each coin's newest stored date; coins with no
+      history get the full `HISTORY_DAYS` window (default: `HISTORY_SYNC_MODE` from config)
+
+    Workers only do network I/O. Every database write happens in the calling thread,
+    which owns the app context and the session. Returns one report dict per coin.
+    """
+    coins = list(coins)
+    if not coins:
+        return []
+
+    config = current_app.config
+    if max_workers is None:
+        max_workers = config.get("HISTORY_FETCH_WORKERS", 4)
+    if incremental is None:
+        incremental = config.get("HISTORY_SYNC_MODE", "incremental") == "incremental"
+    days = config.get("HISTORY_DAYS", 30)
+
+    latest = latest_history_dates([crypto_id for _, crypto_id in coins]) if incremental else {}
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+
+    # Range requests end on a sync-interval boundary, so a retry or another process within the
+    # same interval asks for the same URL and the response cache can answer it
+    step = config.get("UPDATE_INTERVAL_MINUTES", 30) * 60
+    until = int(time.time()) // step * step
+
+    reports = []
+    jobs = []
+    for coingecko_id, crypto_id in coins:
+        since = latest.get(crypto_id)
+        if since is not None and since >= today - datetime.timedelta(days=1):
+            # Already holds yesterday's row, the last complete day: nothing to download
+            reports.append({"coingecko_id": coingecko_id, "mode": "current", "fetch_seconds": 0.0,
+                            "write_seconds": 0.0, "rows": 0, "error": None})
+        else:
+            jobs.append((coingecko_id, crypto_id, since))
+
+    max_workers = max(1, min(max_workers, len(jobs) or 1))
+    print(f"Backfilling historical data for {len(jobs)} coins with {max_workers} workers "
+          f"({len(reports)} already current)...")
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="history-fetch") as pool:
+        futures = [pool.submit(_fetch_history_job, coingecko_id, crypto_id, since, days, until)
+                   for coingecko_id, crypto_id, since in jobs]
+
+        # Single writer: results are persisted as soon as each fetch completes.
+        for future in as_completed(futures):
+            result = future.result()
+            report = {
+                "coingecko_id": result["coingecko_id"],
+                "mode": result["mode"],
+                "fetch_seconds": result["fetch_seconds"],
+                "write_seconds": 0.0,
+                "rows": 0,
+                "error": result["error"],
+            }
+
+            if result["data"]:
+                write_started = time.perf_counter()
+                try:
+                    report["rows"] = store_historical_data(result["coingecko_id"], result["crypto_id"], result["data"])
+                except Exception as e:
+                    db.session.rollback()
+                    report["error"] = str(e)
+                report["write_seconds"] = time.perf_counter() - write_started
+
+            reports.append(report)
+
+    _print_backfill_report(reports, time.perf_counter() - started)
+    return reports
+
+
+def _print_backfill_report(reports, elapsed):
+    """Print totals per mode, the slowest coins' timings and any failures for a backfill run."""
+    modes = {}
+    for report in reports:
+        count, rows = modes.get(report["mode"], (0, 0))
+        modes[report["mode"]] = (count + 1, rows + report["rows"])
+    summary = ", ".join(f"{mode}: {count} coins/{rows} rows" for mode, (count, rows) in sorted(modes.items()))
+    print(f"Historical backfill finished in {elapsed:.2f}s ({summary}):")
+
+    # With thousands of coins a line per coin drowns the log; list only the slowest
+    slowest = sorted(reports, key=lambda r: r["fetch_seconds"] + r["write_seconds"], reverse=True)
+    for report in slowest[:BACKFILL_REPORT_LINES]:
+        status = f"FAILED ({report['error']})" if report["error"] else f"{report['rows']} rows"
+        print(f"  {report['coingecko_id']} [{report['mode']}]: fetch {report['fetch_seconds']:.2f}s, "
+              f"write {report['write_seconds']:.2f}s, {status}")
+
+    failed = [r["coingecko_id"] for r in reports if r["error"]]
+    if failed:
+        print(f"⚠️ {len(failed)}/{len(reports)} coins failed: {', '.join(sorted(failed))}")
+
+    stats = http_client.stats()
+    print(f"HTTP client: {stats['requests']} requests over {stats['connections_opened']} connections "
+          f"({stats['connection_reuse']:.0%} reused), avg latency {stats['latency_avg_ms']:.0f} ms, "
+          f"max {stats['latency_max_ms']:.0f} ms")
 
 
 def update_historical_data(coingecko_id, crypto_id):
     """Fetch and store historical market data for a cryptocurrency, ensuring no duplicate entries."""
     print(f"Fetching historical data for {coingecko_id}...")
     historical_data = fetch_historical_data(coingecko_id)
+    return store_historical_data(coingecko_id, crypto_id, historical_data)
+
+
+def store_historical_data(coingecko_id, crypto_id, historical_data):
+    """Store a fetched market chart payload, skipping dates already present. Returns rows inserted.
 
+    Every point of the payload (hourly up to 90 days back) is also kept as an intraday tick
+    and merged into the rollups and candles.
+    """
     if not historical_data or 'prices' not in historical_data:
         print(f"No historical data found for {coingecko_id}.")
-        return
+        return 0
+
+    ticks = market_chart_ticks(crypto_id, historical_data)
+    record_ticks(ticks)
 
     # Efficient query to check existing records
     existing_dates = {
@@ -78,40 +281,31 @@ def update_historical_data(coingecko_id, crypto_id):
         .distinct()
     }
 
-    new_entries = []
-    for day_data in historical_data['prices']:
-        date = format_date(day_data[0])  
-
-        if date in existing_dates:  
-            print(f"⚠️ Skipping duplicate entry for {coingecko_id} on {date}.")
-            continue  
-
-        price = day_data[1]
-        market_cap = next((item[1] for item in historical_data['market_caps'] if item[0] == day_data[0]), None)
-        volume = next((item[1] for item in historical_data['total_volumes'] if item[0] == day_data[0]), None)
-
-        new_entries.append(
-            {
-                "cryptocurrency_id": crypto_id,
-                "date": date,
-                "price": price,
-                "market_cap": market_cap,
-                "volume": volume
-            }
-        )
+    # One pass over the payload: join on timestamp, collapse to UTC days, drop stored days
+    # and today's, which is still moving and is stored once it has closed
+    rule = current_app.config.get("HISTORY_DAILY_RULE", "close")
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    new_entries = [
+        {"cryptocurrency_id": crypto_id, **row}
+        for row in align_daily(historical_data, rule=rule, skip_dates=existing_dates, before=today)
+    ]
 
     if new_entries:
         print(f"Inserting {len(new_entries)} new historical data entries for {coingecko_id}.")
 
-        # Fix: Use SQLAlchemy Core for bulk insert with conflict handling
-        insert_stmt = insert(HistoricalData).values(new_entries)
-        insert_stmt = insert_stmt.on_conflict_do_nothing(index_elements=["cryptocurrency_id", "date"])
-
-        db.session.execute(insert_stmt)
+        # Backend-specific bulk path (COPY on PostgreSQL, executemany on SQLite)
+        inserted = bulk_insert_historical(new_entries)
+        bump_data_version()
         db.session.commit()
     else:
+        inserted = 0
+        if ticks:
+            bump_data_version()  # The rollups may still have moved
+            db.session.commit()
         print(f"No new historical data to insert for {coingecko_id}. All entries up-to-date.")
 
+    return inserted
+
 
 def create_tables():
     """Create database tables and populate data if they don't exist."""
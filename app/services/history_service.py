@@ -0,0 +1,170 @@
+import numpy as np
+from sqlalchemy import Float, cast, select
+
+from app.models import db, Cryptocurrency, HistoricalData
+from app.services.cache_service import get_data_version
+from app.services.cold_store import cold_store
+from app.services.timeseries_store import timeseries_store
+from app.utils.downsampling import lttb_indices
+from app.utils.timeseries import date_to_epoch_day, epoch_day_to_date
+
+# Numeric columns that can be projected from historical_data
+HISTORY_FIELDS = ("price", "market_cap", "volume")
+
+
+def load_history_columns(coingecko_id, fields=HISTORY_FIELDS):
+    """
+    Reads one coin's history as columns: `{"epoch_days": [...], "<field>s": [...]}`.
+
+    Selects only the date and the requested `fields`, cast to floats in SQL, and reads plain
+    result rows instead of ORM entities. Returns None when the coin has no history.
+    """
+    columns = [cast(getattr(HistoricalData, field), Float) for field in fields]
+    rows = db.session.execute(
+        select(HistoricalData.date, *columns)
+        .join(Cryptocurrency, Cryptocurrency.id == HistoricalData.cryptocurrency_id)
+        .where(Cryptocurrency.coingecko_id == coingecko_id)
+        .order_by(HistoricalData.date.asc())
+    ).all()
+
+    history = None
+    if rows:
+        dates, *values = zip(*rows)
+        history = {"epoch_days": [date_to_epoch_day(date) for date in dates]}
+        for field, column in zip(fields, values):
+            history[f"{field}s"] = list(column)
+    return merge_cold_history(coingecko_id, history, fields)
+
+
+def merge_cold_history(coingecko_id, history, fields, start_day=None, end_day=None):
+    """
+    Adds a coin's archived rows (see `app.services.cold_store`) between two epoch days to
+    columnar `history` from the database, which may be None. Where both tiers hold a day the
+    database row wins. Returns None when neither has any rows.
+    """
+    archived = cold_store.read(coingecko_id, start_day, end_day)
+    if archived is None:
+        return history
+
+    days = np.asarray(archived["epoch_days"], dtype=np.int64)
+    keep = ~np.isin(days, history["epoch_days"]) if history else np.ones(len(days), dtype=bool)
+    columns = {"epoch_days": np.concatenate((days[keep], history["epoch_days"] if history else []))}
+    for field in fields:
+        name = f"{field}s"
+        columns[name] = np.concatenate((np.asarray(archived[name])[keep], history[name] if history else []))
+
+    # Archived days normally all precede the database's; sort in case a backfill reached further back
+    order = np.argsort(columns["epoch_days"], kind="stable")
+    return {name: column[order].tolist() for name, column in columns.items()}
+
+
+def get_history(coingecko_id, fields=HISTORY_FIELDS):
+    """
+    Columnar history for one coin, in the shape returned by `load_history_columns`.
+
+    Served from the in-memory time-series store (brought up to the current data version
+    first), so page traffic does not reach the database. Falls back to a database read
+    while the store has not been loaded. Arrays may be numpy arrays; treat them as read-only.
+    """
+    if not timeseries_store.loaded:
+        return load_history_columns(coingecko_id, fields)
+
+    timeseries_store.refresh(get_data_version())
+    series = timeseries_store.get(coingecko_id)
+    if series is None or not len(series["epoch_days"]):
+        return None
+    return {"epoch_days": series["epoch_days"], **{f"{field}s": series[f"{field}s"] for field in fields}}
+
+
+def history_rows(history):
+    """Turns columnar history into row dicts (`date`, then one key per field) for templates."""
+    if not history:
+        return []
+
+    columns = {name: np.asarray(column).tolist() for name, column in history.items()}
+    days = columns.pop("epoch_days")
+    fields = [name[:-1] for name in columns]  # "prices" -> "price"
+    return [
+        {"date": epoch_day_to_date(day), **dict(zip(fields, values))}
+        for day, *values in zip(days, *columns.values())
+    ]
+
+
+def downsample_history(history, points=None, start=None, end=None):
+    """
+    Trims columnar history to `[start, end]` (dates, inclusive) and reduces it to at most
+    `points` points with LTTB.
+
+    Points are chosen on the price series and the same indices are applied to every other
+    column, so all arrays stay aligned.
+    """
+    days = np.asarray(history["epoch_days"], dtype=np.int64)
+    lo = np.searchsorted(days, date_to_epoch_day(start), side="left") if start else 0
+    hi = np.searchsorted(days, date_to_epoch_day(end), side="right") if end else len(days)
+
+    if lo == 0 and hi == len(days) and (points is None or len(days) <= points):
+        return {name: np.asarray(column).tolist() for name, column in history.items()}
+
+    keep = np.arange(lo, hi)
+    if points is not None and len(keep) > points:
+        prices = np.asarray(history["prices"], dtype=np.float64)[lo:hi]
+        keep = lo + lttb_indices(days[lo:hi], prices, points)
+
+    return {name: np.asarray(column)[keep].tolist() for name, column in history.items()}
+
+
+def load_aligned_history(coingecko_ids, start, end, interval_days=1, anchor_day=0, fields=HISTORY_FIELDS):
+    """
+    Reads several coins' history in one query and aligns it on a shared date axis.
+
+    The query filters on `cryptocurrency_id` and a `date` range, which the
+    `(cryptocurrency_id, date)` unique index answers directly; archived days in the range
+    come from the cold store. Days are grouped into buckets
+    of `interval_days` starting at epoch day `anchor_day`; each bucket keeps its last
+    (closing) value.
+
+    Returns `(epoch_days, {coingecko_id: {"<field>s": [...]}})` where every array has the
+    length of `epoch_days` and holds None where a coin has no data for that bucket.
+    """
+    columns = [cast(getattr(HistoricalData, field), Float) for field in fields]
+    rows = db.session.execute(
+        select(Cryptocurrency.coingecko_id, HistoricalData.date, *columns)
+        .join(Cryptocurrency, Cryptocurrency.id == HistoricalData.cryptocurrency_id)
+        .where(Cryptocurrency.coingecko_id.in_(coingecko_ids),
+               HistoricalData.date >= start,
+               HistoricalData.date <= end)
+        .order_by(HistoricalData.cryptocurrency_id, HistoricalData.date)
+    ).all()
+
+    # Archived rows go first, so a day the database also holds is overwritten by its row
+    archived = []
+    for coingecko_id in coingecko_ids:
+        cold = cold_store.read(coingecko_id, date_to_epoch_day(start), date_to_epoch_day(end))
+        if cold is not None:
+            archived.extend(zip([coingecko_id] * len(cold["epoch_days"]),
+                                map(epoch_day_to_date, cold["epoch_days"].tolist()),
+                                *(cold[f"{field}s"].tolist() for field in fields)))
+    rows = archived + rows
+
+    if not rows:
+        return [], {}
+
+    ids, dates, *values = zip(*rows)
+    ids = np.asarray(ids)
+    days = np.fromiter((date_to_epoch_day(date) for date in dates), dtype=np.int64, count=len(dates))
+    buckets = days - (days - anchor_day) % interval_days
+    axis = np.unique(buckets)
+    values = [np.asarray(column, dtype=np.float64) for column in values]
+
+    series = {}
+    for coingecko_id in dict.fromkeys(ids.tolist()):  # Query order, without repeats
+        mask = ids == coingecko_id
+        slots = np.searchsorted(axis, buckets[mask])
+        coin = {}
+        for field, column in zip(fields, values):
+            aligned = np.full(len(axis), np.nan)
+            aligned[slots] = column[mask]  # Rows are date-ordered, so the last write per bucket wins
+            coin[f"{field}s"] = [None if np.isnan(v) else v for v in aligned.tolist()]
+        series[coingecko_id] = coin
+
+    return axis.tolist(), series
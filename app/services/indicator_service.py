@@ -0,0 +1,138 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from sqlalchemy import func, select
+
+from app.models import db, Cryptocurrency, TechnicalIndicator
+from app.services.history_service import get_history
+from app.services.storage_service import insert_ignore
+from app.utils.timeseries import date_to_epoch_day, epoch_day_to_date
+
+INDICATOR_COLUMNS = ("daily_return", "sma_7", "sma_30", "volatility_30", "rsi_14")
+
+# Prices needed before a day to compute every indicator for it exactly (30-day window of
+# returns, each return needing the previous price)
+LOOKBACK = 31
+
+
+def _rolling_mean(values, window):
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        sums = np.cumsum(np.insert(values, 0, 0.0))
+        out[window - 1:] = (sums[window:] - sums[:-window]) / window
+    return out
+
+
+def _rolling_std(values, window):
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        out[window - 1:] = sliding_window_view(values, window).std(axis=1, ddof=1)
+    return out
+
+
+def _rsi(prices, window):
+    """RSI over simple `window`-day averages of gains and losses (Cutler's variant)."""
+    out = np.full(len(prices), np.nan)
+    if len(prices) <= window:
+        return out
+
+    deltas = np.diff(prices)
+    avg_gain = _rolling_mean(np.clip(deltas, 0, None), window)[window - 1:]
+    avg_loss = _rolling_mean(np.clip(-deltas, 0, None), window)[window - 1:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+    out[window:] = np.where(avg_loss == 0, 100.0, rsi)
+    return out
+
+
+def compute_indicators(prices):
+    """
+    Computes every indicator for a daily price series with rolling windows.
+
+    Returns `{name: ndarray}` aligned with `prices`; entries whose window is not yet full
+    are NaN. Each value depends only on the previous `LOOKBACK` prices.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    returns = np.full(len(prices), np.nan)
+    if len(prices) > 1:
+        returns[1:] = prices[1:] / prices[:-1] - 1
+
+    return {
+        "daily_return": returns,
+        "sma_7": _rolling_mean(prices, 7),
+        "sma_30": _rolling_mean(prices, 30),
+        "volatility_30": _rolling_std(returns, 30),
+        "rsi_14": _rsi(prices, 14),
+    }
+
+
+def latest_indicator_dates(crypto_ids):
+    """Returns `{crypto_id: newest stored indicator date}` in one grouped query."""
+    rows = db.session.execute(
+        select(TechnicalIndicator.cryptocurrency_id, func.max(TechnicalIndicator.date))
+        .where(TechnicalIndicator.cryptocurrency_id.in_(crypto_ids))
+        .group_by(TechnicalIndicator.cryptocurrency_id)
+    ).all()
+    return {crypto_id: latest for crypto_id, latest in rows}
+
+
+def update_indicators(coins):
+    """
+    Extends `technical_indicators` for `(coingecko_id, crypto_id)` pairs.
+
+    Only days after each coin's newest stored indicator row are computed, from a slice of
+    history that starts `LOOKBACK` days earlier, so results match a full recomputation.
+    Does not commit. Returns the number of rows inserted.
+    """
+    coins = list(coins)
+    if not coins:
+        return 0
+
+    latest = latest_indicator_dates([crypto_id for _, crypto_id in coins])
+    rows = []
+    for coingecko_id, crypto_id in coins:
+        history = get_history(coingecko_id, fields=("price",))
+        if not history:
+            continue
+
+        days = np.asarray(history["epoch_days"])
+        stored = latest.get(crypto_id)
+        first_new = np.searchsorted(days, date_to_epoch_day(stored), side="right") if stored else 0
+        if first_new >= len(days):
+            continue  # Nothing appended since the last run
+
+        start = max(0, first_new - LOOKBACK)
+        tail = compute_indicators(np.asarray(history["prices"])[start:])
+        offset = first_new - start
+        values = {name: column[offset:].tolist() for name, column in tail.items()}
+
+        for i, day in enumerate(days[first_new:].tolist()):
+            row = {"cryptocurrency_id": crypto_id, "date": epoch_day_to_date(day)}
+            for name in INDICATOR_COLUMNS:
+                value = values[name][i]
+                row[name] = None if value != value else value  # NaN -> NULL
+            rows.append(row)
+
+    return insert_ignore(TechnicalIndicator.__table__, rows, ("cryptocurrency_id", "date"))
+
+
+def load_indicator_columns(coingecko_id, start=None, end=None):
+    """Reads one coin's indicators as columns: `{"epoch_days": [...], "<indicator>": [...]}`, or None."""
+    query = (
+        select(TechnicalIndicator.date, *(getattr(TechnicalIndicator, name) for name in INDICATOR_COLUMNS))
+        .join(Cryptocurrency, Cryptocurrency.id == TechnicalIndicator.cryptocurrency_id)
+        .where(Cryptocurrency.coingecko_id == coingecko_id)
+        .order_by(TechnicalIndicator.date.asc())
+    )
+    if start:
+        query = query.where(TechnicalIndicator.date >= start)
+    if end:
+        query = query.where(TechnicalIndicator.date <= end)
+
+    rows = db.session.execute(query).all()
+    if not rows:
+        return None
+
+    dates, *values = zip(*rows)
+    indicators = {"epoch_days": [date_to_epoch_day(date) for date in dates]}
+    indicators.update({name: list(column) for name, column in zip(INDICATOR_COLUMNS, values)})
+    return indicators
@@ -0,0 +1,90 @@
+import base64
+import decimal
+import json
+
+from sqlalchemy import String, literal, select, tuple_, type_coerce
+
+from app.models import db, Cryptocurrency
+
+# Sortable overview columns; each has a composite (column, id) index so every page is an index range scan
+SORT_COLUMNS = {
+    "market_cap": Cryptocurrency.market_cap,
+    "price": Cryptocurrency.current_price,
+    "volume": Cryptocurrency.volume,
+    "name": Cryptocurrency.name,
+}
+
+# Direction each column sorts in when none is given
+DEFAULT_ORDERS = {"market_cap": "desc", "price": "desc", "volume": "desc", "name": "asc"}
+
+
+def encode_cursor(value, row_id, position):
+    """Opaque page token for the row at `position` (1-based rank) with sort value `value`."""
+    raw = json.dumps([str(value), row_id, position], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token, sort):
+    """Inverse of `encode_cursor`. Raises ValueError on anything that was not produced by it."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        value, row_id, position = json.loads(raw)
+        if sort != "name":
+            value = decimal.Decimal(value)
+        return value, int(row_id), int(position)
+    except (ValueError, TypeError, decimal.InvalidOperation):
+        raise ValueError("Invalid page cursor")
+
+
+def overview_page(sort="market_cap", order=None, after=None, before=None, limit=50):
+    """
+    Returns one page of the coin overview using keyset pagination.
+
+    Rows are ordered by `(sort column, id)` and a page starts right after (or ends right
+    before) the row a cursor points at, so the database seeks into the matching index and
+    reads `limit + 1` rows however deep the page is, instead of counting past an OFFSET.
+
+    Returns a dict with `rows`, the first row's `start` rank, and `next` / `prev` cursors
+    (None at either end).
+    """
+    column = SORT_COLUMNS[sort]
+    order = order or DEFAULT_ORDERS[sort]
+    key = tuple_(column, Cryptocurrency.id)
+    backwards = before is not None
+    cursor = decode_cursor(before if backwards else after, sort) if (after or before) else None
+
+    # Walking backwards reads the index in the opposite direction and flips the rows afterwards
+    descending = (order == "desc") != backwards
+    # The raw sort value goes into cursors; the ORM's Numeric quantizing could land a cursor
+    # between stored values (SQLite does not enforce the column's scale)
+    query = select(Cryptocurrency, type_coerce(column, String).label("sort_value")).order_by(
+        *((column.desc(), Cryptocurrency.id.desc()) if descending else (column.asc(), Cryptocurrency.id.asc()))
+    ).limit(limit + 1)
+    if cursor:
+        # Bound with the column types so e.g. SQLite compares Numeric values as numbers
+        boundary = tuple_(literal(cursor[0], column.type), literal(cursor[1], Cryptocurrency.id.type))
+        query = query.where(key < boundary if descending else key > boundary)
+
+    rows = db.session.execute(query).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+
+    if backwards:
+        start = max(cursor[2] - len(rows), 1)
+        has_next, has_prev = True, has_more
+    else:
+        start = cursor[2] + 1 if cursor else 1
+        has_next, has_prev = has_more, cursor is not None
+
+    def row_cursor(row, position):
+        coin, sort_value = row
+        return encode_cursor(sort_value, coin.id, position)
+
+    return {
+        "rows": [coin for coin, _ in rows],
+        "start": start,
+        "next": row_cursor(rows[-1], start + len(rows) - 1) if rows and has_next else None,
+        "prev": row_cursor(rows[0], start) if rows and has_prev else None,
+    }
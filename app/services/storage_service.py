@@ -0,0 +1,222 @@
+import csv
+import datetime
+import decimal
+import io
+
+from sqlalchemy import Numeric, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.models import db, Cryptocurrency, HistoricalData, PriceChange
+
+# Rows per statement; keeps bound parameters well under SQLite's limit
+UPSERT_BATCH_SIZE = 500
+
+# Column order used by the historical bulk loaders
+HISTORY_COLUMNS = ("cryptocurrency_id", "date", "price", "market_cap", "volume")
+
+# Columns refreshed on every snapshot. `name` is included so renames on CoinGecko carry over.
+SNAPSHOT_COLUMNS = ("name", "current_price", "market_cap", "volume",
+                    "circulating_supply", "total_supply", "max_supply", "last_updated")
+
+# Columns compared with the stored row; `last_updated` only moves when one of them changed
+TRACKED_COLUMNS = tuple(column for column in SNAPSHOT_COLUMNS if column != "last_updated")
+
+# Snapshot columns recorded as an intraday tick, and their names in `price_ticks`
+TICK_COLUMNS = {"current_price": "price", "market_cap": "market_cap", "volume": "volume"}
+
+
+def dialect_insert(table):
+    """Returns an INSERT for `table` that supports ON CONFLICT on the active backend."""
+    dialect = db.engine.dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(table)
+    if dialect == "sqlite":
+        return sqlite.insert(table)
+    raise NotImplementedError(f"Bulk upserts are not supported on {dialect}")
+
+
+def snapshot_row(coin, now):
+    """Maps one CoinGecko markets entry to a `cryptocurrencies` row, or None if it lacks required values."""
+    if coin.get("current_price") is None or coin.get("market_cap") is None or coin.get("total_volume") is None:
+        return None
+
+    return {
+        "coingecko_id": coin["id"],
+        "name": coin["name"],
+        "current_price": coin["current_price"],
+        "market_cap": coin["market_cap"],
+        "volume": coin["total_volume"],
+        "circulating_supply": coin.get("circulating_supply") or 0,
+        "total_supply": coin.get("total_supply"),
+        "max_supply": coin.get("max_supply"),
+        "last_updated": now,
+    }
+
+
+def _normalize(column, value):
+    """Rounds `value` to the column's declared scale, so incoming floats compare equal to stored values."""
+    if value is None or not isinstance(column.type, Numeric) or column.type.scale is None:
+        return value
+    return decimal.Decimal(str(value)).quantize(decimal.Decimal(1).scaleb(-column.type.scale))
+
+
+def _json_value(value):
+    return float(value) if isinstance(value, decimal.Decimal) else value
+
+
+def upsert_cryptocurrencies(crypto_data):
+    """
+    Writes a markets payload, touching only coins whose values changed.
+
+    Incoming values are rounded to each column's scale and compared with the stored row.
+    New and changed coins are written with `INSERT ... ON CONFLICT (coingecko_id) DO UPDATE`
+    (one statement per `UPSERT_BATCH_SIZE` coins) and get a `price_changes` entry listing
+    just the changed fields; identical coins are not written at all, so `last_updated`
+    records the last change.
+
+    Does not commit. Returns `([(coingecko_id, id)] for every stored coin, changes logged,
+    ticks)`, where `ticks` are `price_ticks` rows for the coins whose price, market cap or
+    volume changed (see `app.services.tick_service.record_ticks`).
+    """
+    now = datetime.datetime.utcnow()
+    table = Cryptocurrency.__table__
+    rows, raw = {}, {}
+    for coin in crypto_data:
+        row = snapshot_row(coin, now)
+        if row is None:
+            print(f"⚠️ Skipping {coin.get('id')}: missing price, market cap or volume.")
+            continue
+        # Ticks keep the payload's own precision; only the snapshot is rounded to its columns
+        raw[row["coingecko_id"]] = {name: row[column] for column, name in TICK_COLUMNS.items()}
+        for column in TRACKED_COLUMNS:
+            row[column] = _normalize(table.c[column], row[column])
+        rows[row["coingecko_id"]] = row  # Last entry wins if the payload repeats a coin
+
+    coingecko_ids = list(rows)
+    existing = {}
+    for start in range(0, len(coingecko_ids), UPSERT_BATCH_SIZE):
+        current = db.session.execute(
+            select(table.c.id, table.c.coingecko_id, *(table.c[column] for column in TRACKED_COLUMNS))
+            .where(table.c.coingecko_id.in_(coingecko_ids[start:start + UPSERT_BATCH_SIZE]))
+        ).mappings()
+        existing.update((record["coingecko_id"], record) for record in current)
+
+    stored, writes, changes = [], [], {}
+    for coingecko_id, row in rows.items():
+        current = existing.get(coingecko_id)
+        if current is None:
+            changed = {column: row[column] for column in TRACKED_COLUMNS}
+        else:
+            stored.append((coingecko_id, current["id"]))
+            changed = {column: row[column] for column in TRACKED_COLUMNS
+                       if _normalize(table.c[column], current[column]) != row[column]}
+        if changed:
+            writes.append(row)
+            changes[coingecko_id] = changed
+
+    ids = {coingecko_id: crypto_id for coingecko_id, crypto_id in stored}
+    for start in range(0, len(writes), UPSERT_BATCH_SIZE):
+        stmt = dialect_insert(table).values(writes[start:start + UPSERT_BATCH_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.coingecko_id],
+            set_={column: stmt.excluded[column] for column in SNAPSHOT_COLUMNS},
+        ).returning(table.c.coingecko_id, table.c.id)
+        for coingecko_id, crypto_id in db.session.execute(stmt):
+            if coingecko_id not in ids:
+                stored.append((coingecko_id, crypto_id))
+            ids[coingecko_id] = crypto_id
+
+    changelog = [
+        {"cryptocurrency_id": ids[coingecko_id], "changed_at": now,
+         "fields": {column: _json_value(value) for column, value in changed.items()}}
+        for coingecko_id, changed in changes.items()
+    ]
+    if changelog:
+        db.session.execute(insert(PriceChange.__table__), changelog)
+
+    ticks = [
+        {"cryptocurrency_id": ids[coingecko_id], "ts": now, **raw[coingecko_id]}
+        for coingecko_id, changed in changes.items() if not changed.keys().isdisjoint(TICK_COLUMNS)
+    ]
+    return stored, len(changelog), ticks
+
+
+def bulk_insert_historical(rows):
+    """
+    Loads `historical_data` rows (dicts keyed by `HISTORY_COLUMNS`), skipping existing
+    `(cryptocurrency_id, date)` pairs. Rows for any number of coins can be passed at once.
+
+    - PostgreSQL: `COPY` into a temporary staging table, then one `INSERT ... SELECT ...
+      ON CONFLICT DO NOTHING` merge.
+    - SQLite: a single `executemany` of `INSERT ... ON CONFLICT DO NOTHING`.
+
+    Runs inside the session's current transaction and does not commit.
+    Returns the number of rows inserted.
+    """
+    if not rows:
+        return 0
+
+    tuples = [tuple(row[column] for column in HISTORY_COLUMNS) for row in rows]
+    connection = db.session.connection()
+    dialect = connection.dialect.name
+
+    if dialect == "postgresql":
+        return _copy_historical_postgresql(connection, tuples)
+    if dialect == "sqlite":
+        return _executemany_historical_sqlite(connection, tuples)
+    raise NotImplementedError(f"Bulk history loading is not supported on {dialect}")
+
+
+def _executemany_historical_sqlite(connection, tuples):
+    # Bind dates as ISO strings, the storage format SQLAlchemy's SQLite Date type reads back
+    tuples = [(crypto_id, date.isoformat(), price, market_cap, volume)
+              for crypto_id, date, price, market_cap, volume in tuples]
+    table = HistoricalData.__tablename__
+    columns = ", ".join(HISTORY_COLUMNS)
+    placeholders = ", ".join("?" for _ in HISTORY_COLUMNS)
+    result = connection.exec_driver_sql(
+        f"INSERT INTO {table} ({columns}) VALUES ({placeholders}) "
+        f"ON CONFLICT (cryptocurrency_id, date) DO NOTHING",
+        tuples,
+    )
+    return result.rowcount
+
+
+def _copy_historical_postgresql(connection, tuples):
+    table = HistoricalData.__tablename__
+    columns = ", ".join(HISTORY_COLUMNS)
+
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(tuples)
+    buffer.seek(0)
+
+    cursor = connection.connection.driver_connection.cursor()
+    try:
+        # Dropped automatically at commit; truncated in case of an earlier load in this transaction
+        cursor.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS historical_data_staging ("
+            "cryptocurrency_id INTEGER, date DATE, price NUMERIC, market_cap NUMERIC, volume NUMERIC"
+            ") ON COMMIT DROP"
+        )
+        cursor.execute("TRUNCATE historical_data_staging")
+        cursor.copy_expert(f"COPY historical_data_staging ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+        cursor.execute(
+            f"INSERT INTO {table} ({columns}) SELECT {columns} FROM historical_data_staging "
+            f"ON CONFLICT (cryptocurrency_id, date) DO NOTHING"
+        )
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
+
+def insert_ignore(table, rows, conflict_columns):
+    """
+    Inserts row dicts into `table` with `ON CONFLICT (conflict_columns) DO NOTHING`, as one
+    executemany of a single parameterized statement, so repeated calls reuse its compiled
+    form. Does not commit. Returns rows inserted.
+    """
+    if not rows:
+        return 0
+    stmt = dialect_insert(table).on_conflict_do_nothing(
+        index_elements=[table.c[column] for column in conflict_columns])
+    return db.session.execute(stmt, rows).rowcount
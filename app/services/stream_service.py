@@ -0,0 +1,226 @@
+import threading
+import time
+from collections import deque
+
+from app.models import db
+from app.services.changelog_service import latest_change_seq, oldest_change_seq, read_changes
+from app.utils.helpers import get_logger
+from app.utils.serialization import dumps_json
+
+# Sent once per connection: how long browsers wait before reconnecting (ms)
+RECONNECT_MS = 5000
+
+# Changelog columns sent to browsers, and their names in `prices` events
+STREAM_FIELDS = {"current_price": "price", "market_cap": "market_cap", "volume": "volume"}
+
+
+def encode_event(seq, event, data):
+    """One event in SSE wire format."""
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (seq, event.encode(), dumps_json(data))
+
+
+def merge_changes(changes):
+    """`{coingecko_id: {name: value}}` of the `STREAM_FIELDS` in changelog entries; later entries win."""
+    coins = {}
+    for seq, coingecko_id, changed_at, fields in changes:
+        streamed = {name: fields[column] for column, name in STREAM_FIELDS.items() if column in fields}
+        if streamed:
+            coins.setdefault(coingecko_id, {}).update(streamed)
+    return coins
+
+
+class Broadcaster:
+    """
+    One-to-many fan-out of server-sent events through a ring buffer.
+
+    Each event is encoded to SSE wire format once, when published, and every connection
+    writes the same bytes. Connections do not get queues of their own: they remember the
+    last sequence number they sent and sleep on one shared condition, so an idle connection
+    costs a waiting thread (or greenlet) and nothing else. A client that reconnects with
+    `Last-Event-ID` is replayed what it missed from the buffer, or through `replay` once it
+    has left the buffer or came from another process.
+    """
+
+    def __init__(self, buffer_size=256):
+        self._events = deque(maxlen=buffer_size)  # (seq, frame)
+        self._condition = threading.Condition()
+        self.seq = 0
+        self.base = 0  # Every event after this sequence number is still buffered
+        self.clients = 0
+        self.published = 0
+
+    def start_at(self, seq):
+        """Numbers events after `seq` from now on, dropping anything buffered."""
+        with self._condition:
+            self._events.clear()
+            self.seq = self.base = seq
+
+    def publish(self, event, data, seq=None):
+        """
+        Encodes and stores one event, then wakes every waiting connection. `seq` (by default
+        the next number) must be above any published so far. Returns its sequence number.
+        """
+        with self._condition:
+            seq = self.seq + 1 if seq is None else seq
+            if len(self._events) == self._events.maxlen:
+                self.base = self._events[0][0]
+            self._events.append((seq, encode_event(seq, event, data)))
+            self.seq = seq
+            self.published += 1
+            self._condition.notify_all()
+            return seq
+
+    def frames_after(self, seq):
+        """
+        `(seq, frame)` of the events published after `seq`, oldest first. Returns None when
+        some of them have already left the buffer.
+        """
+        with self._condition:
+            if seq >= self.seq:
+                return []
+            if seq < self.base:
+                return None
+            return [(event_seq, frame) for event_seq, frame in self._events if event_seq > seq]
+
+    def wait(self, seq, timeout):
+        """Blocks until something newer than `seq` is published or `timeout` seconds pass."""
+        with self._condition:
+            return self._condition.wait_for(lambda: self.seq > seq, timeout)
+
+    def stream(self, last_event_id=None, heartbeat=15, replay=None):
+        """
+        Generator of SSE bytes for one connection. Starts after `last_event_id` when given
+        (replaying missed events), otherwise with the next event published.
+
+        `replay(seq)` catches a connection up from `seq` when the buffer cannot: it returns
+        `(new seq, frame or None)`, or None when the id is unknown or too old, in which case
+        a `reset` event is sent. Without it, such connections are always reset.
+        """
+        with self._condition:
+            self.clients += 1
+            seq = self.seq if last_event_id is None else last_event_id
+            # An id this process has not reached yet was issued elsewhere; check it once
+            unverified = seq > self.seq
+        try:
+            yield b"retry: %d\n\n" % RECONNECT_MS
+            while True:
+                frames = None if unverified else self.frames_after(seq)
+                if frames is None:
+                    unverified = False
+                    caught_up = replay(seq) if replay is not None else None
+                    if caught_up is None:
+                        # Fell too far behind; tell the page to reload its data instead of patching
+                        yield b"event: reset\ndata: {}\n\n"
+                        seq = self.seq
+                        continue
+                    seq, frame = caught_up
+                    if frame:
+                        yield frame
+                    continue
+                if frames:
+                    yield b"".join(frame for _, frame in frames)
+                    seq = frames[-1][0]
+                    continue
+                if not self.wait(seq, heartbeat):
+                    yield b": ping\n\n"  # Keeps proxies from closing an idle connection
+        finally:
+            with self._condition:
+                self.clients -= 1
+
+    def stats(self):
+        with self._condition:
+            return {"seq": self.seq, "clients": self.clients, "published": self.published,
+                    "buffered": len(self._events)}
+
+
+class PriceWatcher:
+    """
+    Publishes per-coin price deltas to a `Broadcaster` as ingestion logs them.
+
+    Ingestion runs in another process and appends every change to `price_changes`, so a
+    single thread per web process tails that log by sequence number (an empty primary-key
+    range scan when nothing happened) and publishes one event per batch of new entries.
+    Events are numbered with the changelog's `seq`, so an event id means the same thing in
+    every process and a client can resume from it anywhere. The thread starts with the first
+    streaming client.
+    """
+
+    def __init__(self, broadcaster):
+        self.broadcaster = broadcaster
+        self.last_seq = None
+        self.app = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self, app):
+        """Starts tailing the log; must be called inside an app context."""
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self.app = app
+                self.check()  # Numbers the first connections' ids before they are handed out
+                self._thread = threading.Thread(target=self._run, name="price-watcher", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        interval = self.app.config.get("STREAM_POLL_SECONDS", 5)
+        with self.app.app_context():
+            while True:
+                try:
+                    self.check()
+                except Exception as e:
+                    get_logger().error(f"Price watcher failed: {e}")
+                finally:
+                    db.session.remove()
+                time.sleep(interval)
+
+    def check(self, batch_size=1000):
+        """Publishes a `prices` event covering every changelog entry since the last check."""
+        if self.last_seq is None:
+            # Pages already render the state at connect time; only later changes are news
+            self.last_seq = latest_change_seq()
+            self.broadcaster.start_at(self.last_seq)
+            return None
+
+        coins = {}
+        while True:
+            changes = read_changes(self.last_seq, limit=batch_size)
+            for coingecko_id, fields in merge_changes(changes).items():
+                coins.setdefault(coingecko_id, {}).update(fields)
+            if changes:
+                self.last_seq = changes[-1][0]
+            if len(changes) < batch_size:
+                break
+
+        if not coins:
+            return None
+        return self.broadcaster.publish("prices", {"seq": self.last_seq, "coins": coins}, seq=self.last_seq)
+
+    def replay(self, after_seq, limit=1000):
+        """
+        Everything logged after `after_seq` as one `prices` frame, read straight from the
+        changelog: `(seq, frame or None)`. Returns None when `after_seq` was never issued,
+        when entries after it have been pruned, or when more than `limit` entries are missing
+        (reloading is cheaper than patching).
+        """
+        with self.app.app_context():
+            try:
+                oldest = oldest_change_seq()
+                if after_seq > latest_change_seq() or (oldest is not None and after_seq < oldest - 1):
+                    return None
+                changes = read_changes(after_seq, limit=limit)
+                if len(changes) == limit:
+                    return None
+                if not changes:
+                    return after_seq, None
+                seq = changes[-1][0]
+                coins = merge_changes(changes)
+                return seq, encode_event(seq, "prices", {"seq": seq, "coins": coins}) if coins else None
+            finally:
+                db.session.remove()
+
+
+# Process-wide fan-out for /api/stream/prices
+price_broadcaster = Broadcaster()
+price_watcher = PriceWatcher(price_broadcaster)
@@ -0,0 +1,168 @@
+import datetime
+
+from flask import current_app
+from sqlalchemy import Float, cast, delete, select
+
+from app.models import db, Cryptocurrency, PriceCandle, PriceRollup, PriceTick
+from app.services.candle_service import build_candles, merge_candles
+from app.services.storage_service import dialect_insert, insert_ignore
+from app.utils.timeseries import bucket_runs, datetime_to_epoch_seconds, epoch_ms_to_datetime, join_market_chart
+
+# Rollup resolutions and the width of their buckets in seconds
+ROLLUP_RESOLUTIONS = {"1h": 3600, "1d": 86400}
+
+# Everything an intraday query can be answered from, finest first; "raw" reads price_ticks
+RESOLUTIONS = ("raw", "1h", "1d")
+
+TICK_FIELDS = ("price", "market_cap", "volume")
+
+
+def market_chart_ticks(crypto_id, market_chart):
+    """
+    Joins a CoinGecko market_chart payload on timestamp into `price_ticks` rows.
+    Points missing any of the three series are skipped.
+    """
+    return [
+        {"cryptocurrency_id": crypto_id, "ts": epoch_ms_to_datetime(ts),
+         "price": price, "market_cap": market_cap, "volume": volume}
+        for ts, price, market_cap, volume in join_market_chart(market_chart)
+    ]
+
+
+def _cutoffs(now):
+    """Oldest tick and hourly bucket still retained at `now`."""
+    config = current_app.config
+    return (now - datetime.timedelta(hours=config.get("TICK_RETENTION_HOURS", 48)),
+            now - datetime.timedelta(days=config.get("HOURLY_ROLLUP_RETENTION_DAYS", 90)))
+
+
+def rollup_ticks(ticks, resolution):
+    """
+    Closing tick per `(coin, bucket)` at `resolution`, as `price_rollups` rows.
+
+    One vectorized pass: ticks are sorted by coin and time, and the last one of every run
+    sharing a coin and bucket is the close.
+    """
+    if not ticks:
+        return []
+
+    order, _, ends, coins, buckets = bucket_runs(
+        [tick["cryptocurrency_id"] for tick in ticks],
+        [datetime_to_epoch_seconds(tick["ts"]) for tick in ticks],
+        ROLLUP_RESOLUTIONS[resolution],
+    )
+    return [
+        {"cryptocurrency_id": int(coin), "resolution": resolution,
+         "bucket": epoch_ms_to_datetime(int(bucket) * 1000),
+         **{field: ticks[index][field] for field in TICK_FIELDS}, "close_at": ticks[index]["ts"]}
+        for coin, bucket, index in zip(coins, buckets, order[ends - 1])
+    ]
+
+
+def merge_rollups(rows):
+    """
+    Upserts rollup rows, keeping whichever close is later when a bucket already exists.
+
+    Because the stored row only moves forward in time, points can be merged in any order and
+    more than once (e.g. a backfill overlapping earlier snapshots) with the same result.
+    One parameterized statement runs as an executemany, so its compiled form is cached
+    instead of rebuilt per batch. Does not commit.
+    """
+    if not rows:
+        return
+    table = PriceRollup.__table__
+    stmt = dialect_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.cryptocurrency_id, table.c.resolution, table.c.bucket],
+        set_={column: stmt.excluded[column] for column in (*TICK_FIELDS, "close_at")},
+        where=stmt.excluded.close_at >= table.c.close_at,
+    )
+    db.session.execute(stmt, rows)
+
+
+def record_ticks(ticks, now=None):
+    """
+    Stores intraday points and folds them into the hourly and daily rollups and the
+    1h / 4h / 1d candles.
+
+    Points older than `TICK_RETENTION_HOURS` only update the aggregates (hourly ones only
+    within `HOURLY_ROLLUP_RETENTION_DAYS`), so a long backfill does not fill `price_ticks`
+    with rows the next prune would delete. Aggregates are merged from the new points alone;
+    stored ticks are never re-read. Does not commit. Returns the number of ticks inserted.
+    """
+    if not ticks:
+        return 0
+
+    tick_cutoff, hourly_cutoff = _cutoffs(now or datetime.datetime.utcnow())
+    hourly = [tick for tick in ticks if tick["ts"] >= hourly_cutoff]
+    merge_rollups(rollup_ticks(hourly, "1h") + rollup_ticks(ticks, "1d"))
+    merge_candles(build_candles(hourly, "1h") + build_candles(ticks, "4h") + build_candles(ticks, "1d"))
+    recent = [tick for tick in ticks if tick["ts"] >= tick_cutoff]
+    return insert_ignore(PriceTick.__table__, recent, ("cryptocurrency_id", "ts"))
+
+
+def prune_intraday(now=None):
+    """
+    Deletes ticks older than `TICK_RETENTION_HOURS`, and hourly rollups and 1h candles older
+    than `HOURLY_ROLLUP_RETENTION_DAYS`. Does not commit. Returns `(ticks, hourly rows)` removed.
+    """
+    tick_cutoff, hourly_cutoff = _cutoffs(now or datetime.datetime.utcnow())
+    ticks = db.session.execute(delete(PriceTick).where(PriceTick.ts < tick_cutoff)).rowcount
+    hourly = db.session.execute(
+        delete(PriceRollup).where(PriceRollup.resolution == "1h", PriceRollup.bucket < hourly_cutoff)
+    ).rowcount
+    hourly += db.session.execute(
+        delete(PriceCandle).where(PriceCandle.interval == "1h", PriceCandle.bucket < hourly_cutoff)
+    ).rowcount
+    return ticks, hourly
+
+
+def pick_resolution(start, end, now=None):
+    """
+    The coarsest resolution that still gives `INTRADAY_MIN_POINTS` points over `[start, end]`.
+
+    Resolutions whose retention does not reach back to `start` are skipped; when none gives
+    enough points, the finest one still covering `start` is used.
+    """
+    config = current_app.config
+    tick_cutoff, hourly_cutoff = _cutoffs(now or datetime.datetime.utcnow())
+    steps = {"raw": config.get("UPDATE_INTERVAL_MINUTES", 30) * 60, **ROLLUP_RESOLUTIONS}
+    retained = [resolution for resolution, cutoff in zip(RESOLUTIONS, (tick_cutoff, hourly_cutoff, None))
+                if cutoff is None or start >= cutoff]
+
+    span = (end - start).total_seconds()
+    min_points = config.get("INTRADAY_MIN_POINTS", 48)
+    for resolution in reversed(retained):
+        if span / steps[resolution] >= min_points:
+            return resolution
+    return retained[0]
+
+
+def load_intraday(coingecko_id, start, end, resolution):
+    """
+    Reads one coin's points in `[start, end]` at `resolution` (see `RESOLUTIONS`) as columns:
+    `{"timestamps": [epoch seconds], "prices": [...], "market_caps": [...], "volumes": [...]}`.
+    Rollup points are stamped with the start of their bucket. Returns None when there are none.
+    """
+    if resolution == "raw":
+        model, stamp = PriceTick, PriceTick.ts
+        filters = ()
+    else:
+        model, stamp = PriceRollup, PriceRollup.bucket
+        filters = (PriceRollup.resolution == resolution,)
+
+    rows = db.session.execute(
+        select(stamp, *(cast(getattr(model, field), Float) for field in TICK_FIELDS))
+        .join(Cryptocurrency, Cryptocurrency.id == model.cryptocurrency_id)
+        .where(Cryptocurrency.coingecko_id == coingecko_id, stamp >= start, stamp <= end, *filters)
+        .order_by(stamp)
+    ).all()
+
+    if not rows:
+        return None
+
+    stamps, *values = zip(*rows)
+    series = {"timestamps": [datetime_to_epoch_seconds(moment) for moment in stamps]}
+    for field, column in zip(TICK_FIELDS, values):
+        series[f"{field}s"] = list(column)
+    return series
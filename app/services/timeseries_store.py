@@ -0,0 +1,178 @@
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+from sqlalchemy import Float, cast, select
+
+from app.models import db, Cryptocurrency, HistoricalData
+from app.utils.timeseries import date_to_epoch_day
+
+# Per-coin arrays held by the store, and their dtypes
+SERIES_COLUMNS = {
+    "epoch_days": np.int32,
+    "prices": np.float64,
+    "market_caps": np.float64,
+    "volumes": np.float64,
+}
+
+
+def merge_columns(current, new):
+    """
+    Appends `new` columns to `current` (either may be None) and returns contiguous arrays
+    ordered by day. Where both hold the same day, the row from `new` wins.
+    """
+    if current is not None:
+        new = {name: np.concatenate((current[name], new[name])) for name in SERIES_COLUMNS}
+
+    days = new["epoch_days"]
+    if len(days) > 1 and not np.all(days[1:] > days[:-1]):
+        # Out-of-order or repeated days: sort, keeping the most recently added row per day
+        order = np.argsort(days, kind="stable")
+        days_sorted = days[order]
+        last = np.append(days_sorted[1:] != days_sorted[:-1], True)
+        new = {name: column[order][last] for name, column in new.items()}
+
+    return {name: np.ascontiguousarray(new[name], dtype=dtype) for name, dtype in SERIES_COLUMNS.items()}
+
+
+class TimeSeriesStore:
+    """
+    Process-local, read-mostly copy of `historical_data` as contiguous numpy arrays per coin.
+
+    Loaded once at boot, from a memory-mapped snapshot when one exists and otherwise from the
+    database. After that only rows with an `id` above the highest one already loaded are
+    pulled, which is cheap because history rows are only ever inserted. Readers get
+    immutable arrays; updates swap in new arrays instead of mutating them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+        self.last_row_id = 0
+        self.version = None
+        self.loaded = False
+
+    def get(self, coingecko_id):
+        """Returns `{column: ndarray}` for a coin (see `SERIES_COLUMNS`), or None."""
+        return self._series.get(coingecko_id)
+
+    def coins(self):
+        return list(self._series)
+
+    def load(self, snapshot_path=None, cold_store=None):
+        """
+        Loads from `snapshot_path` if it holds a snapshot, then catches up from the database.
+
+        Without a snapshot, archived history is read from `cold_store` (see
+        `app.services.cold_store`) first. A snapshot already holds it: the rows were in the
+        store before they were archived.
+        """
+        with self._lock:
+            self._series = {}
+            self.last_row_id = 0
+            if snapshot_path and os.path.exists(os.path.join(snapshot_path, "index.json")):
+                self._load_snapshot(snapshot_path)
+            elif cold_store is not None:
+                for coingecko_id in cold_store.coins():
+                    archived = cold_store.read(coingecko_id)
+                    if archived is not None:
+                        self._merge(coingecko_id, archived)
+            pulled = self._pull_new_rows()
+            self.loaded = True
+        return pulled
+
+    def sync(self):
+        """Pulls rows inserted since the last load or sync. Returns how many were added."""
+        with self._lock:
+            return self._pull_new_rows()
+
+    def refresh(self, version):
+        """Syncs if the data version moved since this store last caught up."""
+        if version == self.version:
+            return
+        with self._lock:
+            if version != self.version:  # Another thread may have refreshed while we waited
+                self._pull_new_rows()
+                self.version = version
+
+    def _pull_new_rows(self):
+        rows = db.session.execute(
+            select(HistoricalData.id, Cryptocurrency.coingecko_id, HistoricalData.date,
+                   cast(HistoricalData.price, Float), cast(HistoricalData.market_cap, Float),
+                   cast(HistoricalData.volume, Float))
+            .join(Cryptocurrency, Cryptocurrency.id == HistoricalData.cryptocurrency_id)
+            .where(HistoricalData.id > self.last_row_id)
+            .order_by(HistoricalData.cryptocurrency_id, HistoricalData.date)
+        ).all()
+        if not rows:
+            return 0
+
+        row_ids, coins, dates, prices, market_caps, volumes = zip(*rows)
+        columns = {
+            "epoch_days": np.fromiter((date_to_epoch_day(d) for d in dates), dtype=np.int32, count=len(dates)),
+            "prices": np.asarray(prices, dtype=np.float64),
+            "market_caps": np.asarray(market_caps, dtype=np.float64),
+            "volumes": np.asarray(volumes, dtype=np.float64),
+        }
+
+        # Rows arrive grouped by coin; split at every coin change
+        coins = np.asarray(coins)
+        bounds = np.flatnonzero(coins[1:] != coins[:-1]) + 1
+        for start, end in zip(np.concatenate(([0], bounds)), np.concatenate((bounds, [len(coins)]))):
+            self._merge(str(coins[start]), {name: column[start:end] for name, column in columns.items()})
+
+        self.last_row_id = max(self.last_row_id, max(row_ids))
+        return len(rows)
+
+    def _merge(self, coingecko_id, new):
+        self._series[coingecko_id] = merge_columns(self._series.get(coingecko_id), new)
+
+    def save_snapshot(self, path):
+        """
+        Writes every coin's arrays as one `.npy` file per column plus an `index.json` of
+        per-coin offsets. The new snapshot replaces the old one once it is fully written.
+        """
+        with self._lock:
+            series = dict(self._series)
+            last_row_id = self.last_row_id
+
+        tmp_path = f"{path}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        index, offset = {}, 0
+        for coingecko_id, columns in series.items():
+            length = len(columns["epoch_days"])
+            index[coingecko_id] = [offset, offset + length]
+            offset += length
+
+        for name, dtype in SERIES_COLUMNS.items():
+            parts = [columns[name] for columns in series.values()]
+            np.save(os.path.join(tmp_path, f"{name}.npy"),
+                    np.concatenate(parts).astype(dtype, copy=False) if parts else np.empty(0, dtype=dtype))
+
+        with open(os.path.join(tmp_path, "index.json"), "w") as f:
+            json.dump({"last_row_id": last_row_id, "coins": index}, f)
+
+        # Readers that memory-mapped the old files keep them until they reload
+        old_path = f"{path}.old"
+        shutil.rmtree(old_path, ignore_errors=True)
+        if os.path.exists(path):
+            os.rename(path, old_path)
+        os.rename(tmp_path, path)
+        shutil.rmtree(old_path, ignore_errors=True)
+
+    def _load_snapshot(self, path):
+        with open(os.path.join(path, "index.json")) as f:
+            index = json.load(f)
+
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in SERIES_COLUMNS}
+        for coingecko_id, (start, end) in index["coins"].items():
+            self._series[coingecko_id] = {name: array[start:end] for name, array in arrays.items()}
+        self.last_row_id = index["last_row_id"]
+
+
+# Process-wide store; loaded in create_app and kept current by the ingestion job
+timeseries_store = TimeSeriesStore()
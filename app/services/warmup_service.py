@@ -0,0 +1,112 @@
+import threading
+import time
+
+from app.models import db
+from app.services.cold_store import cold_store
+from app.services.timeseries_store import timeseries_store
+from app.utils.helpers import get_logger
+
+# Templates compiled during warmup so the first page view does not pay for it
+WARM_TEMPLATES = ("index.html", "_index_table.html", "currency_details.html", "_currency_overview.html",
+                  "_currency_history.html", "trends.html")
+
+
+class StartupState:
+    """
+    Tracks how long this process took to boot and to become ready.
+
+    Times are measured from `process_started` (set when the `app` package is imported), so
+    they cover imports as well as `create_app`. `boot_seconds` is when the app could start
+    serving; `ready_seconds` is when warmup finished and caches were hot.
+    """
+
+    def __init__(self):
+        self.process_started = time.perf_counter()
+        self.boot_seconds = None
+        self.ready_seconds = None
+        self.steps = {}  # warmup step -> seconds
+        self.error = None
+        self._ready = threading.Event()
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def elapsed(self):
+        return time.perf_counter() - self.process_started
+
+    def mark_booted(self):
+        self.boot_seconds = self.elapsed()
+
+    def mark_ready(self):
+        self.ready_seconds = self.elapsed()
+        self._ready.set()
+
+    def wait(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    def as_dict(self):
+        return {
+            "ready": self.ready,
+            "boot_seconds": self.boot_seconds,
+            "ready_seconds": self.ready_seconds,
+            "uptime_seconds": self.elapsed(),
+            "steps": dict(self.steps),
+            "error": self.error,
+        }
+
+
+def warm_up(app):
+    """
+    Runs the startup work that needs the database: creating missing tables, loading the
+    time-series store and compiling templates. Failures are recorded and leave the process
+    unready (so /readyz keeps reporting it) rather than crashing it.
+    """
+    logger = get_logger()
+    steps = (
+        ("create_tables", _create_tables),
+        ("timeseries_store", _load_timeseries_store),
+        ("templates", _compile_templates),
+    )
+    with app.app_context():
+        for name, step in steps:
+            started = time.perf_counter()
+            try:
+                step(app)
+            except Exception as e:
+                startup_state.error = f"{name}: {e}"
+                logger.error(f"Warmup step {name} failed: {e}")
+                return
+            finally:
+                db.session.remove()
+            startup_state.steps[name] = round(time.perf_counter() - started, 4)
+
+    startup_state.mark_ready()
+    logger.info(f"Warmup finished; ready {startup_state.ready_seconds:.2f}s after process start "
+                f"(steps: {startup_state.steps}).")
+
+
+def start_warm_up(app):
+    """Runs `warm_up` on a daemon thread so the process can answer /healthz right away."""
+    thread = threading.Thread(target=warm_up, args=(app,), name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def _create_tables(app):
+    if app.config["AUTO_CREATE_TABLES"]:
+        db.create_all()
+
+
+def _load_timeseries_store(app):
+    rows = timeseries_store.load(app.config["TIMESERIES_SNAPSHOT_PATH"], cold_store)
+    get_logger().info(f"Time-series store loaded: {len(timeseries_store.coins())} coins, {rows} rows from the database.")
+
+
+def _compile_templates(app):
+    for name in WARM_TEMPLATES:
+        app.jinja_env.get_template(name)
+
+
+# Process-wide startup timings and readiness, reported by /healthz and /readyz
+startup_state = StartupState()
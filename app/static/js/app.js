@@ -29,6 +29,9 @@ document.addEventListener('DOMContentLoaded', function() {
             updateCryptoCurrencyPrices();
         })
     }
+
+    // patch prices in place as the server pushes them
+    connectPriceStream();
 }); 
 
 
@@ -58,14 +61,50 @@ async function handleFormSubmission(form) {
 
 
 
-// Update crypto prices by making request to backend 
+// Update crypto prices by making request to backend. New prices arrive over the price
+// stream once ingestion commits them, so the page is not reloaded.
 function updateCryptoCurrencyPrices() {
     fetch('/update_prices')
-        .then(response => response.json())
-        .then(data => {  
-            console.log('Prices updated:', data); 
-            location.reload();
-        })
+        .then(handleAPIError)
+        .then(() => console.log('Price update requested'))
         .catch(error => console.error('Error updating prices:', error)); 
 }
 
+
+// Subscribe to live price deltas on pages that show prices (marked with data-live-prices).
+// Each event carries only the coins and fields that changed: {seq, coins: {id: {field: value}}}.
+function connectPriceStream() {
+    if (!window.EventSource || !document.querySelector('[data-live-prices]')) {
+        return;
+    }
+
+    const source = new EventSource('/api/stream/prices');
+    source.addEventListener('prices', function(e) {
+        const update = JSON.parse(e.data);
+        patchPriceCells(update.coins);
+        // let page scripts (e.g. the trends charts) react as well
+        document.dispatchEvent(new CustomEvent('prices:update', { detail: update }));
+    });
+
+    // the server could not replay everything we missed; start over from fresh data
+    source.addEventListener('reset', function() {
+        location.reload();
+    });
+}
+
+
+// Rewrite the changed cells of rows marked data-coin, leaving the rest of the page alone
+function patchPriceCells(coins) {
+    for (const [coin, fields] of Object.entries(coins)) {
+        const row = document.querySelector(`tr[data-coin="${CSS.escape(coin)}"]`);
+        if (!row) {
+            continue;
+        }
+        for (const [field, value] of Object.entries(fields)) {
+            const cell = row.querySelector(`[data-field="${field}"]`);
+            if (cell && value !== null) {
+                cell.textContent = formatCurrency(value);
+            }
+        }
+    }
+}
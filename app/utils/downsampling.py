@@ -0,0 +1,42 @@
+import numpy as np
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets: picks `threshold` indices of (x, y) that preserve its shape.
+
+    The first and last points are always kept. The points in between are split into
+    `threshold - 2` equal buckets; from each bucket the point forming the largest triangle
+    with the previously kept point and the next bucket's average is kept. Bucket averages and
+    triangle areas are computed with numpy; only the walk from bucket to bucket is a loop.
+
+    Returns a sorted integer array of indices into `x` / `y`.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Bucket boundaries over the interior points [1, n - 1)
+    edges = np.floor(np.linspace(1, n - 1, threshold - 1)).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+
+    # Average of each bucket, plus the last point acting as the bucket after the final one
+    counts = ends - starts
+    x_sums = np.add.reduceat(x[:-1], starts)[: len(starts)]
+    y_sums = np.add.reduceat(y[:-1], starts)[: len(starts)]
+    avg_x = np.append(x_sums / counts, x[-1])
+    avg_y = np.append(y_sums / counts, y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i, (start, end) in enumerate(zip(starts, ends)):
+        bx, by = x[start:end], y[start:end]
+        cx, cy = avg_x[i + 1], avg_y[i + 1]
+        areas = np.abs((x[a] - cx) * (by - y[a]) - (x[a] - bx) * (cy - y[a]))
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+
+    return selected
@@ -1,8 +1,12 @@
+import json
 import locale
 import logging
 import datetime
-import requests
 import time
+from flask import request
+from app.utils.http_client import http_client
+from app.utils.rate_limiter import rate_limiter
+from app.utils.response_cache import response_cache
 
 
 
@@ -20,30 +24,57 @@ def get_logger():
     return logger
 
 
-def safe_request(url, params=None, retries=3, wait=5):
+def safe_request(url, params=None, retries=3, wait=5, endpoint="global"):
     """
     Makes a GET request with retry logic and dynamic wait handling.
 
     - `url`: API endpoint
     - `params`: Query parameters
     - `retries`: Number of retry attempts (default: 3)
-    - `wait`: Default wait time (seconds) between retries (default: 5)
-
+    - `wait`: Default wait time (seconds) on a 429 without a Retry-After header (default: 5)
+    - `endpoint`: Rate limit budget to draw from (see `app.utils.rate_limiter`)
+
+    Fresh responses are served from the shared response cache without a request; stale
+    ones are revalidated with If-None-Match / If-Modified-Since when the API sent validators.
+    Every attempt waits for a token first, so calls are paced before they hit the API.
+    Requests go through the shared pooled client; network errors and 5xx responses are
+    retried with jittered exponential backoff.
     Returns JSON response or raises an exception.
     """
+    import requests  # Deferred so web processes, which never call out, skip importing it
+
+    cached = response_cache.lookup(url, params)
+    if cached and cached["fresh"]:
+        return json.loads(cached["body"])
+    headers = response_cache.conditional_headers(cached)
+
     for attempt in range(retries):
-        response = requests.get(url, params=params)
+        rate_limiter.acquire(endpoint)
+        try:
+            response = http_client.get(url, params=params, headers=headers)
+        except requests.RequestException as e:
+            print(f"API request to {url} failed: {e} (Attempt {attempt+1}/{retries})")
+            time.sleep(http_client.backoff_delay(attempt))
+            continue
 
         if response.status_code == 200:
-            return response.json()
+            data = response.json()
+            response_cache.store(url, params, endpoint, response)
+            return data
+
+        elif response.status_code == 304 and cached:  # Unchanged since we cached it
+            response_cache.refresh(cached, endpoint)
+            return json.loads(cached["body"])
         
         elif response.status_code == 429:  # Rate limit exceeded
             retry_after = int(response.headers.get("Retry-After", wait))  # Use API's suggested wait time
             print(f"⚠️ Rate limit exceeded. Retrying in {retry_after} seconds... (Attempt {attempt+1}/{retries})")
-            time.sleep(retry_after)
+            rate_limiter.pause(retry_after)  # Hold back every thread, not just this one
 
         else:
             print(f"API request failed with status {response.status_code}: {response.text}")
+            if response.status_code >= 500:
+                time.sleep(http_client.backoff_delay(attempt))
 
     raise Exception(f"Failed to fetch data from {url} after {retries} retries")
 
@@ -62,3 +93,56 @@ def format_date(date_value):
         return datetime.datetime.fromtimestamp(date_value).strftime('%Y-%m-%d')
 
     raise ValueError(f"Unsupported date format provided: {date_value}")
+
+
+def parse_date_arg(name):
+    """Reads an optional YYYY-MM-DD query argument as a datetime.date. Raises ValueError if malformed."""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"'{name}' must be a date in YYYY-MM-DD format")
+
+
+def parse_int_arg(name):
+    """Reads an optional integer query argument. Raises ValueError if malformed."""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"'{name}' must be a whole number")
+
+
+def check_date_range(start, end):
+    """Raises ValueError when both ends of a `from` / `to` range are given and out of order."""
+    if start is not None and end is not None and start > end:
+        raise ValueError("'from' must not be after 'to'")
+
+
+def parse_datetime_arg(name):
+    """
+    Reads an optional ISO 8601 query argument (a date, or a date and time) as a naive UTC
+    datetime. Offsets are converted to UTC. Raises ValueError if malformed.
+    """
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        moment = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"'{name}' must be an ISO 8601 date or date and time, e.g. 2024-01-31T12:00")
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def current_minute():
+    """
+    Now as a naive UTC datetime truncated to the minute. Windows ending "now" use it so
+    repeated requests share a cache entry and ETag.
+    """
+    return datetime.datetime.utcnow().replace(second=0, microsecond=0)
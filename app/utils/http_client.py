@@ -0,0 +1,99 @@
+import random
+import threading
+import time
+
+
+class HttpClient:
+    """
+    Shared keep-alive HTTP client for outbound API calls.
+
+    Wraps one `requests.Session` whose adapter keeps a pool of open connections per host,
+    so back-to-back calls skip the TCP+TLS handshake. Adds default timeouts, gzip
+    negotiation, jittered exponential backoff and request/latency statistics.
+    """
+
+    def __init__(self, **settings):
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._errors = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+        self.configure(**settings)
+
+    def configure(self, pool_size=10, connect_timeout=3.05, read_timeout=20,
+                  backoff_base=1.0, backoff_max=30.0):
+        """
+        Sets pool size, timeouts and backoff. Call at startup, before any requests are in flight.
+
+        The session itself is built on first use, so processes that never call out (web
+        workers) never import `requests`.
+        """
+        self.timeout = (connect_timeout, read_timeout)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.pool_size = pool_size
+        self.adapter = None
+        self.session = None
+
+    def _session(self):
+        if self.session is None:
+            with self._lock:
+                if self.session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size, pool_block=False)
+                    session = requests.Session()
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    session.headers.update({"Accept": "application/json", "Accept-Encoding": "gzip, deflate"})
+                    self.adapter, self.session = adapter, session
+        return self.session
+
+    def get(self, url, params=None, headers=None):
+        """GET through the pooled session. Raises `requests.RequestException` on network errors."""
+        session = self._session()
+        import requests  # Already loaded by _session(); a dictionary lookup from here on
+
+        started = time.perf_counter()
+        try:
+            return session.get(url, params=params, headers=headers, timeout=self.timeout)
+        except requests.RequestException:
+            with self._lock:
+                self._errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._requests += 1
+                self._latency_total += elapsed
+                self._latency_max = max(self._latency_max, elapsed)
+
+    def backoff_delay(self, attempt):
+        """Full-jitter exponential backoff: uniform in [0, min(max, base * 2**attempt)]."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def stats(self):
+        """Returns request counts, connection reuse and latency figures since startup."""
+        opened = 0
+        pools = self.adapter.poolmanager.pools if self.adapter is not None else {}
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                opened += pool.num_connections
+
+        with self._lock:
+            requests_made = self._requests
+            return {
+                "requests": requests_made,
+                "errors": self._errors,
+                "connections_opened": opened,
+                "connection_reuse": 1 - opened / requests_made if requests_made else 0.0,
+                "latency_avg_ms": 1000 * self._latency_total / requests_made if requests_made else 0.0,
+                "latency_max_ms": 1000 * self._latency_max,
+            }
+
+
+# Process-wide client shared by every thread that talks to CoinGecko
+http_client = HttpClient()
+
@@ -0,0 +1,110 @@
+import fcntl
+import os
+import threading
+
+from sqlalchemy import text
+
+# Advisory lock id shared by every ingestion process pointed at the same PostgreSQL database
+DEFAULT_LOCK_KEY = 7_210_431_019
+
+
+class LeaderLock:
+    """
+    Non-blocking, process-wide leadership lock for the ingestion jobs.
+
+    On PostgreSQL this is a session-level advisory lock held on a dedicated connection, so
+    it is exclusive across every process and node using the database, and the server
+    releases it when the holder dies or its connection drops. On other databases (SQLite
+    in development) it falls back to an exclusive `flock` on a file next to the instance
+    folder, which is exclusive across the processes of one host.
+    """
+
+    def __init__(self):
+        self.engine = None
+        self.path = None
+        self.key = DEFAULT_LOCK_KEY
+        self._connection = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    def configure(self, engine, path, key=DEFAULT_LOCK_KEY):
+        self.engine = engine
+        self.path = path
+        self.key = key
+
+    @property
+    def backend(self):
+        return "advisory" if self.engine is not None and self.engine.dialect.name == "postgresql" else "file"
+
+    def acquire(self):
+        """Tries to become leader without waiting. Returns True if this process holds the lock."""
+        with self._lock:
+            if self._held():
+                return True
+            self._release()  # Drop whatever is left of a lost lock before retrying
+            return self._acquire_advisory() if self.backend == "advisory" else self._acquire_file()
+
+    def held(self):
+        """Whether this process still holds the lock (an advisory lock dies with its connection)."""
+        with self._lock:
+            return self._held()
+
+    def release(self):
+        with self._lock:
+            self._release()
+
+    def _acquire_advisory(self):
+        # Autocommit keeps the session lock from pinning an open transaction
+        connection = self.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            acquired = connection.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key})
+        except Exception:
+            connection.close()
+            raise
+        if not acquired:
+            connection.close()
+            return False
+        self._connection = connection
+        return True
+
+    def _acquire_file(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        lock_file = open(self.path, "a+")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        lock_file.truncate(0)
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        self._file = lock_file
+        return True
+
+    def _held(self):
+        if self._file is not None:
+            return True
+        if self._connection is None:
+            return False
+        try:
+            self._connection.execute(text("SELECT 1"))
+            return True
+        except Exception:
+            return False  # Connection gone, and the server released the lock with it
+
+    def _release(self):
+        if self._connection is not None:
+            try:
+                self._connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+                self._connection.close()
+            except Exception:
+                pass  # A dead connection already released the lock server-side
+            self._connection = None
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+
+# Process-wide lock; configured by the scheduler before it schedules any job
+leader_lock = LeaderLock()
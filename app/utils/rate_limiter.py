@@ -0,0 +1,80 @@
+import threading
+import time
+
+# Default budgets as (calls per minute, burst). "global" caps the sum of all endpoint classes.
+DEFAULT_RATE_LIMITS = {
+    "global": (30, 5),
+    "markets": (10, 3),
+    "market_chart": (25, 5),
+}
+
+
+class TokenBucket:
+    """Thread-safe token bucket. Tokens refill continuously at `rate_per_minute` up to `burst`."""
+
+    def __init__(self, rate_per_minute, burst):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """Takes a token and returns how long the caller must wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1  # May go negative: later callers queue up behind this one
+
+            wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+            return max(wait, self.blocked_until - now)
+
+    def acquire(self):
+        """Blocks until a token is available. Returns the seconds spent waiting."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds):
+        """Empties the bucket and holds every caller back for `seconds` (e.g. after a 429)."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens = min(self.tokens, 0.0)
+            self.blocked_until = max(self.blocked_until, now + seconds)
+
+
+class RateLimiter:
+    """A set of named token buckets. Every call also draws from the shared "global" bucket."""
+
+    def __init__(self, limits=None):
+        self._lock = threading.Lock()
+        self.configure(limits or DEFAULT_RATE_LIMITS)
+
+    def configure(self, limits):
+        """Replaces the buckets with `{endpoint_class: (calls_per_minute, burst)}`."""
+        limits = {**DEFAULT_RATE_LIMITS, **limits}
+        with self._lock:
+            self.buckets = {name: TokenBucket(rate, burst) for name, (rate, burst) in limits.items()}
+
+    def acquire(self, endpoint="global"):
+        """Blocks until both the endpoint's bucket and the global bucket allow a call."""
+        waited = 0.0
+        bucket = self.buckets.get(endpoint)
+        if bucket is not None and endpoint != "global":
+            waited += bucket.acquire()
+        return waited + self.buckets["global"].acquire()
+
+    def pause(self, seconds):
+        """Backs off every endpoint class, used when the API answers 429 anyway."""
+        self.buckets["global"].pause(seconds)
+
+
+# Process-wide limiter shared by every thread that talks to CoinGecko
+rate_limiter = RateLimiter()
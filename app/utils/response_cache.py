@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Seconds a cached response is served without asking the API again, per endpoint class
+DEFAULT_CACHE_TTLS = {
+    "global": 60,
+    "markets": 60,
+    "market_chart": 900,
+}
+
+# Entries this far past expiry are deleted instead of revalidated
+STALE_RETENTION = 86_400
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    body BLOB NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+)
+"""
+
+
+class ResponseCache:
+    """
+    Disk-backed cache of API responses keyed by URL and query parameters.
+
+    Backed by a SQLite file in WAL mode, so several processes (e.g. gunicorn workers) can
+    read and write the same cache. Fresh entries are served without a request; expired
+    entries that carry an ETag or Last-Modified header are revalidated conditionally.
+    """
+
+    def __init__(self, path=None, ttls=None):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.configure(path, ttls)
+
+    def configure(self, path, ttls=None):
+        """Points the cache at `path` (None disables it) with `{endpoint_class: ttl_seconds}`."""
+        self.path = path
+        self.ttls = {**DEFAULT_CACHE_TTLS, **(ttls or {})}
+        self._local = threading.local()  # Drop connections to any previous file
+
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._conn().execute("DELETE FROM responses WHERE expires_at < ?", (time.time() - STALE_RETENTION,))
+
+    def _conn(self):
+        """One connection per thread; SQLite connections must not be shared across threads."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(url, params=None):
+        raw = json.dumps([url, sorted((params or {}).items())], default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def lookup(self, url, params=None):
+        """Returns the cached entry as a dict (with a `fresh` flag), or None."""
+        if not self.path:
+            return None
+
+        key = self.make_key(url, params)
+        row = self._conn().execute(
+            "SELECT body, etag, last_modified, expires_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None:
+            self._count("misses")
+            return None
+
+        body, etag, last_modified, expires_at = row
+        fresh = expires_at > time.time()
+        if fresh:
+            self._count("hits")
+        elif not (etag or last_modified):
+            self._count("misses")
+            return None  # Nothing to revalidate with; treat as a miss
+
+        return {"key": key, "body": body, "etag": etag, "last_modified": last_modified, "fresh": fresh}
+
+    @staticmethod
+    def conditional_headers(entry):
+        """Builds If-None-Match / If-Modified-Since headers for revalidating `entry`."""
+        headers = {}
+        if entry:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url, params, endpoint, response):
+        """Saves a 200 response body along with its validators."""
+        if not self.path:
+            return
+
+        now = time.time()
+        self._conn().execute(
+            "INSERT OR REPLACE INTO responses (key, url, body, etag, last_modified, fetched_at, expires_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (self.make_key(url, params), url, response.content, response.headers.get("ETag"),
+             response.headers.get("Last-Modified"), now, now + self.ttl(endpoint)),
+        )
+
+    def refresh(self, entry, endpoint):
+        """Extends an entry's lifetime after the API confirmed it unchanged (304)."""
+        self._count("revalidated")
+        now = time.time()
+        self._conn().execute(
+            "UPDATE responses SET fetched_at = ?, expires_at = ? WHERE key = ?",
+            (now, now + self.ttl(endpoint), entry["key"]),
+        )
+
+    def ttl(self, endpoint):
+        return self.ttls.get(endpoint, self.ttls["global"])
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "revalidated": self.revalidated, "misses": self.misses}
+
+
+# Process-wide cache; create_app points it at a file under the instance folder
+response_cache = ResponseCache()
@@ -0,0 +1,56 @@
+import hashlib
+import json
+
+from flask import current_app, request
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder when orjson isn't installed
+    orjson = None
+
+
+def dumps_json(payload):
+    """Serializes `payload` to compact JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+def make_etag(cache_key, version):
+    """
+    ETag for a cached payload. Keys embed raw query values, which may hold characters an
+    ETag cannot (`"`), so only a digest of the key and data version goes on the wire.
+    """
+    return hashlib.blake2b(f"{cache_key}-{version}".encode(), digest_size=16).hexdigest()
+
+
+def json_response(body, etag, status=200):
+    """Wraps a pre-serialized JSON body with an ETag; browsers must revalidate before reuse."""
+    response = current_app.response_class(body, status=status, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def cached_json_response(cache, cache_key, version, build):
+    """
+    Answers a GET with the JSON payload stored under `cache_key` for `version` in `cache` (a
+    `PayloadCache`), calling `build()` to produce it on a miss. The ETag is derived from the
+    same key and version, so a matching `If-None-Match` gets a 304 without touching the cache.
+
+    `build` may return None when there is nothing to serve; nothing is cached then and None
+    is returned so the caller can answer with its own error.
+    """
+    etag = make_etag(cache_key, version)
+    if request.if_none_match.contains(etag):
+        return json_response(b"", etag, status=304)
+
+    body = cache.get(cache_key, version)
+    if body is None:
+        payload = build()
+        if payload is None:
+            return None
+        body = dumps_json(payload)
+        cache.put(cache_key, version, body)
+
+    return json_response(body, etag)
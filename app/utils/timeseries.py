@@ -0,0 +1,116 @@
+import datetime
+
+import numpy as np
+
+MS_PER_DAY = 86_400_000
+EPOCH = datetime.date(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+
+# How a UTC day's hourly points are collapsed into the single row we store
+DAILY_RULES = ("open", "close", "mean")
+
+
+def epoch_day_to_date(epoch_day):
+    """Converts a count of days since 1970-01-01 (UTC) to a datetime.date."""
+    return EPOCH + datetime.timedelta(days=epoch_day)
+
+
+def date_to_epoch_day(date):
+    """Converts a datetime.date to a count of days since 1970-01-01."""
+    return date.toordinal() - EPOCH_ORDINAL
+
+
+def join_market_chart(market_chart):
+    """
+    Joins a CoinGecko market_chart payload on timestamp, yielding `(ms, price, market_cap,
+    volume)` in payload order. Points missing any of the three series are skipped.
+    """
+    market_caps = dict(market_chart.get("market_caps") or ())
+    volumes = dict(market_chart.get("total_volumes") or ())
+    for ts, price in market_chart.get("prices") or ():
+        market_cap = market_caps.get(ts)
+        volume = volumes.get(ts)
+        if price is not None and market_cap is not None and volume is not None:
+            yield ts, price, market_cap, volume
+
+
+def align_daily(market_chart, rule="close", skip_dates=None, before=None):
+    """
+    Joins a CoinGecko market_chart payload on timestamp and buckets it into UTC days.
+
+    - `market_chart`: dict with `prices`, `market_caps` and `total_volumes` as `[ms, value]` pairs
+    - `rule`: which value represents a day - `open` (first point), `close` (last point) or `mean`
+    - `skip_dates`: dates already stored; their buckets are dropped from the output
+    - `before`: first date to leave out, e.g. today (UTC) so a day still in progress is never
+      stored; a stored day is not revisited, so it would keep its value as of the fetch
+
+    Runs in a single pass over each array. Returns row dicts `{date, price, market_cap, volume}`
+    sorted by date. Days missing any of the three series are skipped.
+    """
+    if rule not in DAILY_RULES:
+        raise ValueError(f"Unsupported daily rule: {rule}")
+
+    # epoch_day -> [price, market_cap, volume, point_count, last_ts]
+    buckets = {}
+    for ts, price, market_cap, volume in join_market_chart(market_chart):
+        day = int(ts // MS_PER_DAY)
+        bucket = buckets.get(day)
+        if bucket is None:
+            buckets[day] = [price, market_cap, volume, 1, ts]
+        elif rule == "mean":
+            bucket[0] += price
+            bucket[1] += market_cap
+            bucket[2] += volume
+            bucket[3] += 1
+        elif rule == "close" and ts >= bucket[4]:
+            buckets[day] = [price, market_cap, volume, 1, ts]
+        elif rule == "open" and ts < bucket[4]:
+            buckets[day] = [price, market_cap, volume, 1, ts]
+
+    skip_dates = skip_dates or ()
+    rows = []
+    for day in sorted(buckets):
+        date = epoch_day_to_date(day)
+        if date in skip_dates or (before is not None and date >= before):
+            continue
+
+        price, market_cap, volume, count, _ = buckets[day]
+        rows.append({
+            "date": date,
+            "price": price / count,
+            "market_cap": market_cap / count,
+            "volume": volume / count,
+        })
+
+    return rows
+
+
+EPOCH_DATETIME = datetime.datetime(1970, 1, 1)
+
+
+def datetime_to_epoch_seconds(moment):
+    """Converts a naive UTC datetime to whole seconds since 1970-01-01."""
+    return int((moment - EPOCH_DATETIME).total_seconds())
+
+
+def epoch_ms_to_datetime(ms):
+    """Converts a CoinGecko millisecond timestamp to a naive UTC datetime (the form stored in the database)."""
+    return EPOCH_DATETIME + datetime.timedelta(milliseconds=ms)
+
+
+def bucket_runs(keys, seconds, step):
+    """
+    Sorts points by `(key, time)` and splits them into runs that share a key and a bucket of
+    `step` seconds.
+
+    Returns `(order, starts, ends, run_keys, run_buckets)`: the sorting permutation, each
+    run's first and one-past-last position in sorted order, and its key and bucket start
+    (epoch seconds). Reductions over a run can then be done with `np.<ufunc>.reduceat`.
+    """
+    keys = np.asarray(keys, dtype=np.int64)
+    seconds = np.asarray(seconds, dtype=np.int64)
+    order = np.lexsort((seconds, keys))
+    keys, buckets = keys[order], seconds[order] - seconds[order] % step
+    starts = np.flatnonzero(np.insert((keys[1:] != keys[:-1]) | (buckets[1:] != buckets[:-1]), 0, True))
+    ends = np.append(starts[1:], len(keys))
+    return order, starts, ends, keys[starts], buckets[starts]
@@ -0,0 +1,39 @@
+"""Widen cryptocurrencies.current_price to 8 decimal places
+
+Revision ID: 5a9d3c1e7f42
+Revises: c41e9a7d5f28
+Create Date: 2026-10-19 09:14:36.508221
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a9d3c1e7f42'
+down_revision = 'c41e9a7d5f28'
+branch_labels = None
+depends_on = None
+
+
+def _alter_current_price(existing_type, type_):
+    if op.get_bind().dialect.name != 'sqlite':
+        op.alter_column('cryptocurrencies', 'current_price',
+                        existing_type=existing_type, type_=type_, existing_nullable=False)
+        return
+    # SQLite rebuilds the table, and batch mode cannot reflect the unnamed UNIQUE(coingecko_id)
+    # that upserts conflict on, so it is declared again here
+    with op.batch_alter_table('cryptocurrencies', schema=None,
+                              table_args=(sa.UniqueConstraint('coingecko_id'),)) as batch_op:
+        batch_op.alter_column('current_price',
+               existing_type=existing_type,
+               type_=type_,
+               existing_nullable=False)
+
+
+def upgrade():
+    _alter_current_price(sa.Numeric(precision=18, scale=2), sa.Numeric(precision=18, scale=8))
+
+
+def downgrade():
+    _alter_current_price(sa.Numeric(precision=18, scale=8), sa.Numeric(precision=18, scale=2))
@@ -0,0 +1,33 @@
+"""Never reuse price_changes.seq on SQLite
+
+Revision ID: b6e04f9c2d15
+Revises: 5a9d3c1e7f42
+Create Date: 2026-10-19 09:52:03.114870
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e04f9c2d15'
+down_revision = '5a9d3c1e7f42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # PostgreSQL sequences never go back; SQLite needs AUTOINCREMENT, which means rebuilding the table
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('price_changes', schema=None, recreate='always',
+                              table_kwargs={'sqlite_autoincrement': True}) as batch_op:
+        pass
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('price_changes', schema=None, recreate='always',
+                              table_kwargs={'sqlite_autoincrement': False}) as batch_op:
+        pass
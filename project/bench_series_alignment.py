@@ -0,0 +1,50 @@
+"""Microbenchmark: per-point next() scans vs. align_daily on synthetic market_chart payloads.
+
+Run from the repository root: python project/bench_series_alignment.py
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.timeseries import align_daily
+
+HOUR_MS = 3_600_000
+
+
+def make_payload(points):
+    """Hourly points ending now, shaped like CoinGecko's market_chart response."""
+    end = 1_700_000_000_000
+    timestamps = [end - (points - i) * HOUR_MS for i in range(points)]
+    return {
+        "prices": [[ts, random.uniform(1, 100_000)] for ts in timestamps],
+        "market_caps": [[ts, random.uniform(1e6, 1e12)] for ts in timestamps],
+        "total_volumes": [[ts, random.uniform(1e3, 1e10)] for ts in timestamps],
+    }
+
+
+def quadratic_join(payload):
+    """The previous update_historical_data loop, minus the database work."""
+    rows = []
+    for ts, price in payload["prices"]:
+        market_cap = next((item[1] for item in payload["market_caps"] if item[0] == ts), None)
+        volume = next((item[1] for item in payload["total_volumes"] if item[0] == ts), None)
+        rows.append((ts, price, market_cap, volume))
+    return rows
+
+
+def bench(points, repeat=3):
+    payload = make_payload(points)
+    results = {"align_daily": min(timeit.repeat(lambda: align_daily(payload), number=1, repeat=repeat))}
+    if points <= 5_000:  # The quadratic join takes minutes beyond this
+        results["next() scan"] = min(timeit.repeat(lambda: quadratic_join(payload), number=1, repeat=repeat))
+    return results
+
+
+if __name__ == "__main__":
+    for points in (720, 2_160, 5_000, 100_000, 1_000_000):
+        timings = bench(points)
+        line = ", ".join(f"{name}: {seconds * 1000:.1f} ms" for name, seconds in timings.items())
+        print(f"{points:>9,} points -> {line}")
@@ -0,0 +1,9 @@
+# Ingestion entry point: run one or more of these next to the web processes.
+# Only the process holding the leader lock fetches data; the others wait as standbys.
+from app import create_app
+from app.scheduler import run_worker
+
+app = create_app(background_warmup=False)  # Ingestion needs the store loaded before it starts
+
+if __name__ == "__main__":
+    run_worker(app)